@@ -1,85 +1,119 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, Integer
-from app.models import Cutoff, College
-from app.schemas import CutoffOut
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Dict, Final, List, Optional, Sequence, Tuple
+import orjson
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, or_, Integer, func, distinct, literal, select, text, union_all
+from app.models import Cutoff, College, CutoffSuggestion
+from app.schemas import CollegeSuggestionResponse
+from app.utils.cache import LockedTTLCache
 
 
-class CollegeSuggestionRequest(BaseModel):
-    """Request schema for college suggestion API"""
-    rank: int
-    caste: str  # e.g., "OPEN", "OBC", "SC", "ST", "EWS", "NT1", "NT2", "NT3", "SBC", "SEBC", "VJ"
-    gender: str  # "MALE" or "FEMALE"
-    seat_type: str  # "H" (Home), "O" (Other), "S" (State), "AI" (All India)
-    special_reservation: Optional[str] = None  # "PWD", "DEFENCE", "ORPHAN", "TFWS"
+# Common branch abbreviations to full names mapping used by branch search
+_BRANCH_MAPPINGS: Final[Dict[str, Tuple[str, ...]]] = {
+    'CS': ('Computer Science', 'Computer Science and Engineering'),
+    'IT': ('Information Technology',),
+    'ECE': ('Electronics and Communication', 'Electronics and Telecommunication'),
+    'ENTC': ('Electronics and Telecommunication', 'Electronics and Communication'),
+    'MECH': ('Mechanical Engineering', 'Mechanical'),
+    'CIVIL': ('Civil Engineering', 'Civil'),
+    'EEE': ('Electrical Engineering', 'Electrical and Electronics'),
+    'ELECTRICAL': ('Electrical Engineering', 'Electrical and Electronics'),
+    'CHEMICAL': ('Chemical Engineering', 'Chemical'),
+    'BIOTECH': ('Biotechnology', 'Biomedical Engineering'),
+    'AUTOMOBILE': ('Automobile Engineering', 'Automotive'),
+    'PRODUCTION': ('Production Engineering', 'Manufacturing'),
+    'INSTRUMENTATION': ('Instrumentation Engineering', 'Instrumentation')
+}
 
+# Seat type -> Cutoff.level
+# Based on the database analysis: H->other, S->state, O->?
+_SEAT_LEVEL_MAP: Final[Dict[str, str]] = {
+    "H": "other",  # Home state candidates get "other" level
+    "O": "other",  # Other state candidates also get "other" level
+    "S": "state",  # State level
+    "AI": "all india"  # All India
+}
 
-class CollegeSuggestionResponse(BaseModel):
-    """Response schema for college suggestion API"""
-    college: str
-    branch: str
-    category: str
-    cutoff_rank: int
-    percent: Optional[float]
-    gender: str
-    level: str
-    year: int
-    stage: str
+# Seat type -> suffix used in category codes (e.g. GOPENS)
+_SEAT_CODE_MAP: Final[Dict[str, str]] = {
+    "H": "H",
+    "O": "O",
+    "S": "S",
+    "AI": "AI"
+}
 
-    class Config:
-        orm_mode = True
+# Suggestion results are cached per rank bucket; cutoffs only change when a
+# new CAP round is loaded, so an hour-long TTL is plenty. Entries hold
+# cutoff_suggestions view rows. The cache is per process: a refresh run by
+# load_pdf_data.py clears only that script's copy, so it is the TTL that
+# bounds how long an API worker keeps serving the previous view (restart the
+# server to pick up a reload at once)
+_SUGGESTION_RANK_BUCKET: Final[int] = 100
+_SUGGESTION_CACHE_TTL: Final[int] = 3600
+_suggestion_cache = LockedTTLCache(maxsize=10_000, ttl=_SUGGESTION_CACHE_TTL)
 
+# Columns fetched by get_college_details_by_rank: exactly the fields of
+# CollegeSuggestionResponse
+_DETAIL_COLUMNS: Final[Tuple] = (
+    College.name.label("college_name"),
+    Cutoff.branch,
+    Cutoff.category,
+    Cutoff.rank,
+    Cutoff.percent,
+    Cutoff.gender,
+    Cutoff.level,
+    Cutoff.year,
+    Cutoff.stage,
+)
 
-def get_suggested_colleges(
-    db: Session,
-    rank: int,
+
+def clear_suggestion_cache() -> None:
+    """Drop this process's cached suggestion results."""
+    _suggestion_cache.clear()
+
+
+def refresh_cutoff_suggestions(db: Session) -> None:
+    """
+    Rebuild the cutoff_suggestions materialized view from the cutoffs table.
+    
+    Call this after loading or editing cutoffs; CONCURRENTLY keeps the view
+    readable by the suggestion endpoints while it refreshes. Only the calling
+    process's suggestion cache is cleared; running API workers see the new
+    rows once their cached entries expire (_SUGGESTION_CACHE_TTL).
+    """
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY cutoff_suggestions"))
+    db.commit()
+    clear_suggestion_cache()
+
+
+@lru_cache(maxsize=1024)
+def _compute_category_patterns(
     caste: str,
     gender: str,
     seat_type: str,
     special_reservation: Optional[str] = None,
-    limit: int = 20
-) -> List[Cutoff]:
+    default_seat_code: str = "H",
+    include_unsuffixed: bool = True
+) -> Tuple[str, ...]:
     """
-    Get top 20 colleges based on student's rank and preferences.
+    Compute the exact category codes matching a student profile.
+    
+    Inputs are expected to be normalized (upper-cased, stripped) so the
+    small input space is fully cached after warm-up.
     
     Args:
-        db: Database session
-        rank: Student's CET rank
-        caste: Student's caste category (OPEN, OBC, SC, ST, EWS, NT1, NT2, NT3, SBC, SEBC, VJ)
+        caste: Student's caste category
         gender: Student's gender (MALE, FEMALE)
         seat_type: Type of seat (H-Home, O-Other, S-State, AI-All India)
         special_reservation: Special reservation type (PWD, DEFENCE, ORPHAN, TFWS)
-        limit: Maximum number of colleges to return (default 20)
+        default_seat_code: Suffix used when the seat type is not recognised
+        include_unsuffixed: Also match the category without a seat suffix
         
     Returns:
-        List of colleges with cutoff ranks greater than or equal to student's rank,
-        sorted by cutoff rank (lowest first)
+        Tuple of category codes
     """
     
-    # Normalize inputs
-    caste = caste.upper().strip()
-    gender = gender.upper().strip()
-    seat_type = seat_type.upper().strip()
-    
-    # Build base query with join to get college name
-    query = db.query(Cutoff).join(College).filter(
-        Cutoff.rank >= rank,  # Student's rank should be better than or equal to cutoff (student can get admission)
-        Cutoff.rank.isnot(None)  # Exclude null ranks
-    )
-    
-    # Filter by seat type/level
-    # Based on the database analysis: H->other, S->state, O->? 
-    seat_type_mapping = {
-        "H": "other",  # Home state candidates get "other" level
-        "O": "other",  # Other state candidates also get "other" level  
-        "S": "state",  # State level
-        "AI": "all india"  # All India
-    }
-    
-    if seat_type in seat_type_mapping:
-        query = query.filter(Cutoff.level.contains(seat_type_mapping[seat_type]))
-
     # Construct category filter based on the database pattern
     # Format: [GENDER][CASTE][SEAT_TYPE] or [SPECIAL_RESERVATION][GENDER][CASTE][SEAT_TYPE] or TFWS
     # Examples: GOPENS, GOBCS, LOPENS, LSEBCS, GNT2S, GNT3S, TFWS, etc.
@@ -87,14 +121,7 @@ def get_suggested_colleges(
     gender_code = 'G' if gender == 'MALE' else 'L'
     
     # Map seat types to their database codes
-    seat_type_code_mapping = {
-        "H": "H",
-        "O": "O", 
-        "S": "S",
-        "AI": "AI"
-    }
-    
-    seat_type_code = seat_type_code_mapping.get(seat_type, "H")
+    seat_type_code = _SEAT_CODE_MAP.get(seat_type, default_seat_code)
     
     # Handle special reservations
     if special_reservation:
@@ -102,53 +129,226 @@ def get_suggested_colleges(
         # Handle special cases for PWD variants
         if special_code == 'PWD':
             # PWD can be stored as PWD or PWDR in database (no gender code)
-            category_patterns = [
+            return (
                 f"PWD{caste}{seat_type_code}",
                 f"PWDR{caste}{seat_type_code}"
-            ]
+            )
         elif special_code == 'DEFENCE':
             # DEFENCE can be stored as DEF or DEFR in database (no gender code)
-            category_patterns = [
+            return (
                 f"DEFR{caste}{seat_type_code}",
                 f"DEF{caste}{seat_type_code}"
-            ]
+            )
         elif special_code == 'ORPHAN':
             # ORPHAN is stored as just "ORPHAN"
-            category_patterns = [
-                f"ORPHAN"
-            ]
+            return ("ORPHAN",)
         elif special_code == 'TFWS':
             # TFWS is stored as just "TFWS"
-            category_patterns = [
-                f"TFWS"
-            ]
+            return ("TFWS",)
         else:
             # Other special reservations (no gender code)
-            category_patterns = [
-                f"{special_code}{caste}{seat_type_code}"
-            ]
-    else:
-        # Regular category without special reservation
+            return (f"{special_code}{caste}{seat_type_code}",)
+    
+    # Regular category without special reservation
+    if include_unsuffixed:
         # Try both with and without seat type code since some categories might not have it
-        category_patterns = [
+        return (
             f"{gender_code}{caste}{seat_type_code}",
             f"{gender_code}{caste}"
-        ]
+        )
+    return (f"{gender_code}{caste}{seat_type_code}",)
+
+
+def _build_cutoff_filters(
+    rank: int,
+    caste: str,
+    gender: str,
+    seat_type: str,
+    special_reservation: Optional[str] = None,
+    default_seat_code: str = "H",
+    include_unsuffixed: bool = True,
+    model=Cutoff
+) -> list:
+    """
+    Build the SQLAlchemy filter expressions shared by the suggestion queries.
+    
+    Args:
+        rank: Student's CET rank
+        caste: Student's caste category
+        gender: Student's gender (MALE, FEMALE)
+        seat_type: Type of seat (H-Home, O-Other, S-State, AI-All India)
+        special_reservation: Special reservation type (PWD, DEFENCE, ORPHAN, TFWS)
+        default_seat_code: Category suffix used when the seat type is not recognised
+        include_unsuffixed: Also match the category without a seat suffix
+        model: Mapped class to filter on (Cutoff or CutoffSuggestion)
+        
+    Returns:
+        List of filter expressions to pass to ``Query.filter``
+    """
+    
+    # Normalize inputs
+    caste = caste.upper().strip()
+    gender = gender.upper().strip()
+    seat_type = seat_type.upper().strip()
+    
+    filters = [
+        model.rank >= rank,  # Student's rank should be better than or equal to cutoff (student can get admission)
+        model.rank.isnot(None)  # Exclude null ranks
+    ]
+    
+    # Filter by seat type/level
+    if seat_type in _SEAT_LEVEL_MAP:
+        filters.append(model.level == _SEAT_LEVEL_MAP[seat_type])
+    
+    category_patterns = _compute_category_patterns(
+        caste, gender, seat_type, special_reservation, default_seat_code, include_unsuffixed
+    )
+    
+    # Category patterns are exact codes, so an IN lookup can use the
+    # (category, level, rank) index instead of scanning with LIKE '%...%'
+    filters.append(model.category.in_(category_patterns))
+    
+    return filters
+
+
+def get_suggested_colleges(
+    db: Session,
+    rank: int,
+    caste: str,
+    gender: str,
+    seat_type: str,
+    special_reservation: Optional[str] = None,
+    limit: int = 20
+) -> List[CutoffSuggestion]:
+    """
+    Get top 20 colleges based on student's rank and preferences.
+    
+    Args:
+        db: Database session
+        rank: Student's CET rank
+        caste: Student's caste category (OPEN, OBC, SC, ST, EWS, NT1, NT2, NT3, SBC, SEBC, VJ)
+        gender: Student's gender (MALE, FEMALE)
+        seat_type: Type of seat (H-Home, O-Other, S-State, AI-All India)
+        special_reservation: Special reservation type (PWD, DEFENCE, ORPHAN, TFWS)
+        limit: Maximum number of colleges to return (default 20)
+        
+    Returns:
+        List of cutoff_suggestions rows (college name in ``college_name``) with
+        cutoff ranks greater than or equal to student's rank, sorted by cutoff
+        rank (lowest first)
+    """
+    
+    # Students whose ranks share a bucket reuse one cached query run from the
+    # bucket floor; fetch extra rows so the exact-rank re-filter below still
+    # has `limit` results in most cases
+    bucket_floor = (rank // _SUGGESTION_RANK_BUCKET) * _SUGGESTION_RANK_BUCKET
+    fetch_limit = limit * 2
+    cache_key = (
+        bucket_floor,
+        caste.upper().strip(),
+        gender.upper().strip(),
+        seat_type.upper().strip(),
+        special_reservation.upper() if special_reservation else None,
+        fetch_limit,
+    )
     
-    # Apply category filter with OR condition for multiple patterns
-    category_filters = []
-    for pattern in category_patterns:
-        category_filters.append(Cutoff.category.like(f"%{pattern}%"))
+    cached = _suggestion_cache.get(cache_key)
+    if cached is None:
+        cached = tuple(_query_suggested_colleges(
+            db, bucket_floor, caste, gender, seat_type, special_reservation, fetch_limit
+        ))
+        # Detach the rows so they can be shared across requests once this
+        # session is closed
+        for row in cached:
+            db.expunge(row)
+        _suggestion_cache.set(cache_key, cached)
     
-    if category_filters:
-        query = query.filter(or_(*category_filters))
+    result = [row for row in cached if row.rank >= rank][:limit]
     
-    # Order by cutoff rank (lowest first) and limit results
-    result = query.order_by(Cutoff.rank.asc()).limit(limit).all()
+    # The cached prefix was truncated before reaching `limit` rows for this
+    # exact rank, so fall back to a direct query
+    if len(result) < limit and len(cached) == fetch_limit:
+        result = _query_suggested_colleges(
+            db, rank, caste, gender, seat_type, special_reservation, limit
+        )
     
     return result
 
 
+def _query_suggested_colleges(
+    db: Session,
+    rank: int,
+    caste: str,
+    gender: str,
+    seat_type: str,
+    special_reservation: Optional[str],
+    limit: int
+) -> List[CutoffSuggestion]:
+    """Run the uncached suggestion query for get_suggested_colleges."""
+    
+    filters = _build_cutoff_filters(
+        rank, caste, gender, seat_type, special_reservation, model=CutoffSuggestion
+    )
+    
+    # The materialized view already carries the college name, so there is
+    # no JOIN; order by cutoff rank (lowest first) and limit results
+    return (
+        db.query(CutoffSuggestion)
+        .filter(*filters)
+        .order_by(CutoffSuggestion.rank.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_suggested_colleges_batch(
+    db: Session,
+    requests: Sequence[Tuple[int, str, str, str, Optional[str]]],
+    limit: int = 20
+) -> List[List[CutoffSuggestion]]:
+    """
+    get_suggested_colleges for several student profiles in one round-trip.
+    
+    Args:
+        db: Database session
+        requests: (rank, caste, gender, seat_type, special_reservation) tuples
+        limit: Maximum number of colleges per request
+        
+    Returns:
+        One list of cutoff_suggestions rows per request, in request order,
+        each sorted by cutoff rank (lowest first)
+    """
+    if not requests:
+        return []
+    
+    # One top-`limit` SELECT per profile, tagged with its position, glued
+    # together with UNION ALL; each part is wrapped in a subquery because
+    # not every backend accepts ORDER BY/LIMIT on a bare compound member
+    parts = []
+    for index, (rank, caste, gender, seat_type, special_reservation) in enumerate(requests):
+        filters = _build_cutoff_filters(
+            rank, caste, gender, seat_type, special_reservation, model=CutoffSuggestion
+        )
+        top = (
+            select(CutoffSuggestion, literal(index).label("request_index"))
+            .where(*filters)
+            .order_by(CutoffSuggestion.rank.asc())
+            .limit(limit)
+            .subquery()
+        )
+        parts.append(select(top))
+    
+    combined = union_all(*parts).subquery()
+    suggestion = aliased(CutoffSuggestion, combined)
+    
+    results: List[List[CutoffSuggestion]] = [[] for _ in requests]
+    for row, index in db.execute(select(suggestion, combined.c.request_index)):
+        results[index].append(row)
+    for rows in results:
+        rows.sort(key=lambda row: row.rank)
+    return results
+
+
 def get_college_details_by_rank(
     db: Session,
     rank: int,
@@ -159,10 +359,10 @@ def get_college_details_by_rank(
     branch: Optional[str] = None,
     special_reservation: Optional[str] = None,
     limit: int = 50
-) -> List[Cutoff]:
+) -> List[Row]:
     """
     Get detailed cutoff information for specific college/branch combination.
-    Uses normalized branch names from ranked_colleges table for better search.
+    Branch filters match cutoff branch names and expand abbreviations like 'CS'.
     
     Args:
         db: Database session
@@ -175,16 +375,24 @@ def get_college_details_by_rank(
         special_reservation: Special reservation type (optional)
         
     Returns:
-        List of matching cutoff records
+        List of matching cutoff rows (college name in ``college_name``)
     """
     
-    # Start with base filters - join with College and optionally RankedCollege for normalized branch names
-    query = db.query(Cutoff).join(College).filter(
-        Cutoff.rank >= rank,  # Use same logic as get_suggested_colleges
-        Cutoff.rank.isnot(None)
+    # Same rank/seat/category filters as get_suggested_colleges, but only the
+    # seat-suffixed category and a State default for unknown seat types
+    filters = _build_cutoff_filters(
+        rank, caste, gender, seat_type, special_reservation,
+        default_seat_code="S", include_unsuffixed=False
+    )
+    
+    # Only the columns CollegeSuggestionResponse reads: plain rows instead
+    # of Cutoff/College instances, with the college name from the JOIN
+    query = (
+        db.query(*_DETAIL_COLUMNS)
+        .join(Cutoff.college)
+        .filter(*filters)
     )
     
-    # Apply filters from get_suggested_colleges
     if college_name:
         query = query.filter(College.name.contains(college_name))
     
@@ -193,91 +401,79 @@ def get_college_details_by_rank(
         # Create flexible branch matching patterns
         branch_patterns = []
         
-        # Common branch abbreviations to full names mapping
-        branch_mappings = {
-            'CS': ['Computer Science', 'Computer Science and Engineering'],
-            'IT': ['Information Technology'],
-            'ECE': ['Electronics and Communication', 'Electronics and Telecommunication'],
-            'ENTC': ['Electronics and Telecommunication', 'Electronics and Communication'],
-            'MECH': ['Mechanical Engineering', 'Mechanical'],
-            'CIVIL': ['Civil Engineering', 'Civil'],
-            'EEE': ['Electrical Engineering', 'Electrical and Electronics'],
-            'ELECTRICAL': ['Electrical Engineering', 'Electrical and Electronics'],
-            'CHEMICAL': ['Chemical Engineering', 'Chemical'],
-            'BIOTECH': ['Biotechnology', 'Biomedical Engineering'],
-            'AUTOMOBILE': ['Automobile Engineering', 'Automotive'],
-            'PRODUCTION': ['Production Engineering', 'Manufacturing'],
-            'INSTRUMENTATION': ['Instrumentation Engineering', 'Instrumentation']
-        }
-        
         # Add the original branch term
         branch_patterns.append(Cutoff.branch.ilike(f"%{branch}%"))
         
         # Check if the branch matches any known abbreviations
-        branch_upper = branch.upper()
-        if branch_upper in branch_mappings:
-            for full_name in branch_mappings[branch_upper]:
-                branch_patterns.append(Cutoff.branch.ilike(f"%{full_name}%"))
+        for full_name in _BRANCH_MAPPINGS.get(branch.upper(), ()):
+            branch_patterns.append(Cutoff.branch.ilike(f"%{full_name}%"))
         
         # Apply OR condition for all branch patterns
         query = query.filter(or_(*branch_patterns))
     
-    # Apply the same category and seat type filters as main function
-    caste = caste.upper().strip()
-    gender = gender.upper().strip()
-    seat_type = seat_type.upper().strip()
+    return query.order_by(Cutoff.rank.asc()).limit(limit).all()
+
+
+def get_recommended_colleges(
+    db: Session,
+    rank: int,
+    caste: str,
+    gender: str,
+    seat_type: str,
+    special_reservation: Optional[str] = None,
+    limit: int = 20
+) -> List[bytes]:
+    """
+    get_college_details_by_rank without college/branch filters, cached.
     
-    seat_type_mapping = {
-        "H": "other",  # Home state candidates get "other" level
-        "O": "other",  # Other state candidates also get "other" level
-        "S": "state",  # State level
-        "AI": "all india"  # All India
-    }
+    Uses the same rank buckets, cache and invalidation as
+    get_suggested_colleges. The cache stores JSON-encoded
+    CollegeSuggestionResponse objects, so a hit needs neither the database
+    nor Pydantic.
     
-    if seat_type in seat_type_mapping:
-        query = query.filter(Cutoff.level.contains(seat_type_mapping[seat_type]))
+    Returns:
+        One encoded JSON object per matching cutoff, sorted by cutoff rank
+        (lowest first)
+    """
+    bucket_floor = (rank // _SUGGESTION_RANK_BUCKET) * _SUGGESTION_RANK_BUCKET
+    fetch_limit = limit * 2
+    cache_key = (
+        "recommend",
+        bucket_floor,
+        caste.upper().strip(),
+        gender.upper().strip(),
+        seat_type.upper().strip(),
+        special_reservation.upper() if special_reservation else None,
+        fetch_limit,
+    )
     
-    # Use the same category pattern logic as get_suggested_colleges
-    gender_code = 'G' if gender == 'MALE' else 'L'
-    seat_type_code_mapping = {
-        "H": "H",
-        "O": "O", 
-        "S": "S",
-        "AI": "AI"
-    }
-    seat_type_code = seat_type_code_mapping.get(seat_type, "S")
+    cached = _suggestion_cache.get(cache_key)
+    if cached is None:
+        cached = _encode_cutoffs(get_college_details_by_rank(
+            db, bucket_floor, caste, gender, seat_type,
+            special_reservation=special_reservation, limit=fetch_limit
+        ))
+        _suggestion_cache.set(cache_key, cached)
     
-    # Handle special reservations
-    if special_reservation:
-        special_code = special_reservation.upper()
-        if special_code == 'PWD':
-            category_patterns = [
-                f"PWD{caste}{seat_type_code}",
-                f"PWDR{caste}{seat_type_code}"
-            ]
-        elif special_code == 'DEFENCE':
-            category_patterns = [
-                f"DEFR{caste}{seat_type_code}",
-                f"DEF{caste}{seat_type_code}"
-            ]
-        elif special_code == 'ORPHAN':
-            category_patterns = [f"ORPHAN"]
-        elif special_code == 'TFWS':
-            category_patterns = [f"TFWS"]
-        else:
-            category_patterns = [f"{special_code}{caste}{seat_type_code}"]
-    else:
-        category_patterns = [f"{gender_code}{caste}{seat_type_code}"]
-    
-    # Apply category filter
-    category_filters = []
-    for pattern in category_patterns:
-        category_filters.append(Cutoff.category.like(f"%{pattern}%"))
+    result = [body for cutoff_rank, body in cached if cutoff_rank >= rank][:limit]
     
-    if category_filters:
-        query = query.filter(or_(*category_filters))
+    # Same fallback as get_suggested_colleges: the cached prefix ran out
+    # before `limit` rows for this exact rank
+    if len(result) < limit and len(cached) == fetch_limit:
+        result = [body for _, body in _encode_cutoffs(get_college_details_by_rank(
+            db, rank, caste, gender, seat_type,
+            special_reservation=special_reservation, limit=limit
+        ))]
     
-    return query.order_by(Cutoff.rank.asc()).limit(limit).all()
+    return result
+
+
+def _encode_cutoffs(rows: List[Row]) -> Tuple[Tuple[int, bytes], ...]:
+    """(cutoff rank, encoded response object) pairs for get_recommended_colleges."""
+    return tuple(
+        (row.rank, orjson.dumps(CollegeSuggestionResponse.model_validate(row).model_dump()))
+        for row in rows
+    )
 
 
 def get_college_statistics(
@@ -290,13 +486,27 @@ def get_college_statistics(
     """
     Get statistics about available colleges for the given student profile.
     
+    Counts, distincts and the rank range are aggregated in the database
+    rather than by loading every matching cutoff row.
+    
     Returns:
         Dictionary containing statistics like total colleges, branches, etc.
     """
     
-    colleges = get_suggested_colleges(db, rank, caste, gender, seat_type, limit=1000)
+    filters = _build_cutoff_filters(rank, caste, gender, seat_type, model=CutoffSuggestion)
+    
+    # Core selects return plain tuples/scalars, skipping ORM row processing
+    total, unique_colleges, total_branches, min_rank, max_rank = db.execute(
+        select(
+            func.count(CutoffSuggestion.id),
+            func.count(distinct(CutoffSuggestion.college_name)),
+            func.count(distinct(CutoffSuggestion.branch)),
+            func.min(CutoffSuggestion.rank),
+            func.max(CutoffSuggestion.rank)
+        ).where(*filters)
+    ).one()
     
-    if not colleges:
+    if not total:
         return {
             "total_colleges": 0,
             "total_branches": 0,
@@ -305,19 +515,21 @@ def get_college_statistics(
             "categories": []
         }
     
-    unique_colleges = set(college.college.name for college in colleges)
-    unique_branches = set(college.branch for college in colleges)
-    seat_types = set(college.level for college in colleges)
-    categories = set(college.category for college in colleges)
+    seat_types = db.execute(
+        select(CutoffSuggestion.level).distinct().where(*filters)
+    ).scalars().all()
+    categories = db.execute(
+        select(CutoffSuggestion.category).distinct().where(*filters)
+    ).scalars().all()
     
     return {
-        "total_colleges": len(colleges),
-        "total_branches": len(unique_branches),
-        "unique_colleges": len(unique_colleges),
+        "total_colleges": total,
+        "total_branches": total_branches,
+        "unique_colleges": unique_colleges,
         "seat_types": list(seat_types),
         "categories": list(categories),
         "rank_range": {
-            "min": min(college.rank for college in colleges),
-            "max": max(college.rank for college in colleges)
+            "min": min_rank,
+            "max": max_rank
         }
     }
@@ -2,10 +2,10 @@
 CRUD operations for authentication and user management
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, noload, selectinload
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_
-from typing import Optional, List
+from sqlalchemy import and_, exists, or_, func, update
+from typing import FrozenSet, Optional, List, Tuple
 from datetime import datetime, timedelta
 
 from app.models import User, Role, Permission, user_roles, role_permissions
@@ -14,11 +14,40 @@ from app.auth_utils import AuthUtils
 from fastapi import HTTPException, status
 
 
+def _row_exists(db: Session, model, row_id: int) -> bool:
+    """SELECT EXISTS on a primary key, without loading the row."""
+    return db.query(db.query(model.id).filter(model.id == row_id).exists()).scalar()
+
+
+def _insert_link(db: Session, table, **values) -> bool:
+    """
+    Insert a row into an association table, treating an existing link as success.
+    
+    Goes through Core so the related ORM collections are never loaded; the
+    composite primary key makes a duplicate insert fail with IntegrityError.
+    Any other IntegrityError (e.g. a foreign key to a user or role deleted
+    since it was checked) leaves no link behind and returns False.
+    """
+    try:
+        db.execute(table.insert().values(**values))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        match = [table.c[column] == value for column, value in values.items()]
+        return db.query(exists().where(*match)).scalar()
+    return True
+
+
 class UserCRUD:
     @staticmethod
     def get_user(db: Session, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        """Get user by ID (roles loaded, as the user routes report them)."""
+        return (
+            db.query(User)
+            .options(selectinload(User.roles))
+            .filter(User.id == user_id)
+            .first()
+        )
     
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -33,39 +62,68 @@ class UserCRUD:
     @staticmethod
     def get_users(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[User]:
         """Get list of users with pagination."""
-        query = db.query(User)
+        # One IN query loads roles for the whole page instead of one per user
+        query = db.query(User).options(selectinload(User.roles))
         if active_only:
             query = query.filter(User.is_active == True)
         return query.offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_users_with_role_names(
+        db: Session, skip: int = 0, limit: int = 100, active_only: bool = True
+    ) -> List[Tuple[User, List[str]]]:
+        """Get a page of users paired with their active role names."""
+        query = db.query(User).options(noload(User.roles))
+        if active_only:
+            query = query.filter(User.is_active == True)
+        users = query.offset(skip).limit(limit).all()
+        
+        # One join for the whole page instead of walking each user's roles
+        roles_by_user_id = {user.id: [] for user in users}
+        if roles_by_user_id:
+            rows = (
+                db.query(user_roles.c.user_id, Role.name)
+                .join(Role, Role.id == user_roles.c.role_id)
+                .filter(user_roles.c.user_id.in_(roles_by_user_id), Role.is_active == True)
+                .all()
+            )
+            for user_id, role_name in rows:
+                roles_by_user_id[user_id].append(role_name)
+        
+        return [(user, roles_by_user_id[user.id]) for user in users]
+    
     @staticmethod
     def create_user(db: Session, user: UserCreate) -> User:
         """Create a new user."""
-        # Check if user already exists
-        if UserCRUD.get_user_by_email(db, user.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+        # Hash before touching the session so no pooled connection is held
+        # open while bcrypt runs
+        hashed_password = AuthUtils.hash_password(user.password)
         
-        if user.phone and UserCRUD.get_user_by_phone(db, user.phone):
+        # Check if user already exists (email or phone) in a single round-trip
+        conflict = func.lower(User.email) == user.email.lower()
+        if user.phone:
+            conflict = or_(conflict, User.phone == user.phone)
+        # At most two rows can match (one per unique column); read both so an
+        # email conflict is reported first no matter which row comes back first
+        existing = db.query(User.email).filter(conflict).limit(2).all()
+        
+        if existing:
+            if any(row.email.lower() == user.email.lower() for row in existing):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Phone number already registered"
             )
         
-        # Hash password
-        hashed_password = AuthUtils.hash_password(user.password)
-        
         # Create user
         db_user = User(
             email=user.email,
             phone=user.phone,
             password_hash=hashed_password,
-            full_name=user.full_name,
-            login_count=0,
-            is_active=True,
-            is_verified=False
+            full_name=user.full_name
         )
         
         try:
@@ -131,16 +189,35 @@ class UserCRUD:
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password."""
-        user = UserCRUD.get_user_by_email(db, email)
-        if not user or not user.is_active:
+        # Only the columns needed for the check; no User instance yet
+        credentials = db.query(User.id, User.password_hash).filter(
+            func.lower(User.email) == email.lower(),  # uses ix_users_email_lower
+            User.is_active == True
+        ).first()
+        if not credentials:
             return None
         
-        if not AuthUtils.verify_password(password, user.password_hash):
+        # End the read transaction so the connection goes back to the pool
+        # while the (deliberately slow) hash check runs
+        db.rollback()
+        
+        if not AuthUtils.verify_password(password, credentials.password_hash):
             return None
         
-        # Update login count and last login
-        user.login_count += 1
-        user.last_login = datetime.utcnow()
+        values = {"login_count": User.login_count + 1, "last_login": datetime.utcnow()}
+        
+        # Upgrade bcrypt (or outdated Argon2) hashes while we have the plain password
+        if AuthUtils.needs_rehash(credentials.password_hash):
+            values["password_hash"] = AuthUtils.hash_password(password)
+        
+        # Update login count and last login in one UPDATE ... RETURNING; the
+        # increment happens in SQL so concurrent logins can't overwrite it
+        user = db.execute(
+            update(User)
+            .where(User.id == credentials.id, User.is_active == True)
+            .values(**values)
+            .returning(User)
+        ).scalar_one_or_none()
         db.commit()
         
         return user
@@ -155,13 +232,19 @@ class UserCRUD:
                 detail="User not found"
             )
         
-        if not AuthUtils.verify_password(current_password, db_user.password_hash):
+        # Release the connection while hashing (see authenticate_user)
+        password_hash = db_user.password_hash
+        db.rollback()
+        
+        if not AuthUtils.verify_password(current_password, password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
-        db_user.password_hash = AuthUtils.hash_password(new_password)
+        new_password_hash = AuthUtils.hash_password(new_password)
+        
+        db_user.password_hash = new_password_hash
         db_user.updated_at = datetime.utcnow()
         db.commit()
         return True
@@ -169,49 +252,42 @@ class UserCRUD:
     @staticmethod
     def assign_role_to_user(db: Session, user_id: int, role_id: int) -> bool:
         """Assign a role to a user."""
-        user = UserCRUD.get_user(db, user_id)
-        role = RoleCRUD.get_role(db, role_id)
-        
-        if not user or not role:
+        if not _row_exists(db, User, user_id) or not _row_exists(db, Role, role_id):
             return False
         
-        # Check if already assigned
-        if role in user.roles:
-            return True
-        
-        user.roles.append(role)
-        db.commit()
-        return True
+        return _insert_link(db, user_roles, user_id=user_id, role_id=role_id)
     
     @staticmethod
     def remove_role_from_user(db: Session, user_id: int, role_id: int) -> bool:
         """Remove a role from a user."""
-        user = UserCRUD.get_user(db, user_id)
-        role = RoleCRUD.get_role(db, role_id)
-        
-        if not user or not role:
+        if not _row_exists(db, User, user_id) or not _row_exists(db, Role, role_id):
             return False
         
-        if role in user.roles:
-            user.roles.remove(role)
-            db.commit()
-        
+        db.execute(
+            user_roles.delete().where(
+                user_roles.c.user_id == user_id,
+                user_roles.c.role_id == role_id
+            )
+        )
+        db.commit()
         return True
     
     @staticmethod
-    def get_user_permissions(db: Session, user_id: int) -> List[str]:
+    def get_user_permissions(db: Session, user_id: int) -> FrozenSet[str]:
         """Get all permissions for a user through their roles."""
-        user = UserCRUD.get_user(db, user_id)
-        if not user:
-            return []
-        
-        permissions = set()
-        for role in user.roles:
-            if role.is_active:
-                for permission in role.permissions:
-                    permissions.add(permission.name)
+        # One SELECT DISTINCT across the association tables; no User, Role or
+        # Permission objects are loaded
+        rows = (
+            db.query(Permission.name)
+            .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+            .join(Role, Role.id == role_permissions.c.role_id)
+            .join(user_roles, user_roles.c.role_id == Role.id)
+            .filter(user_roles.c.user_id == user_id, Role.is_active == True)
+            .distinct()
+            .all()
+        )
         
-        return list(permissions)
+        return frozenset(row.name for row in rows)
 
 
 class RoleCRUD:
@@ -228,7 +304,11 @@ class RoleCRUD:
     @staticmethod
     def get_roles(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Role]:
         """Get list of roles with pagination."""
-        query = db.query(Role)
+        # One IN query loads permissions for the whole page instead of one per
+        # role; list_roles only reports their names
+        query = db.query(Role).options(
+            selectinload(Role.permissions).load_only(Permission.id, Permission.name)
+        )
         if active_only:
             query = query.filter(Role.is_active == True)
         return query.offset(skip).limit(limit).all()
@@ -236,17 +316,10 @@ class RoleCRUD:
     @staticmethod
     def create_role(db: Session, role: RoleCreate) -> Role:
         """Create a new role."""
-        # Check if role already exists
-        if RoleCRUD.get_role_by_name(db, role.name):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Role name already exists"
-            )
-        
+        # Duplicate names are rejected by the unique index on roles.name
         db_role = Role(
             name=role.name,
-            description=role.description,
-            is_active=True
+            description=role.description
         )
         
         try:
@@ -258,7 +331,7 @@ class RoleCRUD:
             db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Role creation failed"
+                detail="Role name already exists"
             )
     
     @staticmethod
@@ -303,33 +376,24 @@ class RoleCRUD:
     @staticmethod
     def assign_permission_to_role(db: Session, role_id: int, permission_id: int) -> bool:
         """Assign a permission to a role."""
-        role = RoleCRUD.get_role(db, role_id)
-        permission = PermissionCRUD.get_permission(db, permission_id)
-        
-        if not role or not permission:
+        if not _row_exists(db, Role, role_id) or not _row_exists(db, Permission, permission_id):
             return False
         
-        # Check if already assigned
-        if permission in role.permissions:
-            return True
-        
-        role.permissions.append(permission)
-        db.commit()
-        return True
+        return _insert_link(db, role_permissions, role_id=role_id, permission_id=permission_id)
     
     @staticmethod
     def remove_permission_from_role(db: Session, role_id: int, permission_id: int) -> bool:
         """Remove a permission from a role."""
-        role = RoleCRUD.get_role(db, role_id)
-        permission = PermissionCRUD.get_permission(db, permission_id)
-        
-        if not role or not permission:
+        if not _row_exists(db, Role, role_id) or not _row_exists(db, Permission, permission_id):
             return False
         
-        if permission in role.permissions:
-            role.permissions.remove(permission)
-            db.commit()
-        
+        db.execute(
+            role_permissions.delete().where(
+                role_permissions.c.role_id == role_id,
+                role_permissions.c.permission_id == permission_id
+            )
+        )
+        db.commit()
         return True
 
 
@@ -352,13 +416,7 @@ class PermissionCRUD:
     @staticmethod
     def create_permission(db: Session, permission: PermissionCreate) -> Permission:
         """Create a new permission."""
-        # Check if permission already exists
-        if PermissionCRUD.get_permission_by_name(db, permission.name):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Permission name already exists"
-            )
-        
+        # Duplicate names are rejected by the unique index on permissions.name
         db_permission = Permission(
             name=permission.name,
             description=permission.description,
@@ -375,7 +433,7 @@ class PermissionCRUD:
             db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Permission creation failed"
+                detail="Permission name already exists"
             )
     
     @staticmethod
@@ -2,28 +2,79 @@
 Authentication and Authorization Dependencies for FastAPI
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 from functools import wraps
+import os
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models import User
 from app.auth_utils import AuthUtils, PermissionChecker
 from app.auth_crud import UserCRUD
+from app.utils.cache import LockedTTLCache
 
 
 # Security scheme
 security = HTTPBearer()
 
+# Authenticated users and their active role names, cached per user_id so each
+# request doesn't re-SELECT the user and its roles. Entries hold detached
+# instances; routes that change a user's account or roles invalidate them,
+# but only in the process that handled the change. With several uvicorn
+# WORKERS the others keep serving the old is_active flag and role names until
+# the entry expires, so USER_CACHE_TTL (seconds) bounds how long a deleted,
+# deactivated or re-roled user stays authorized there.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+_user_cache = LockedTTLCache(maxsize=5000, ttl=USER_CACHE_TTL)
 
-def get_current_user(
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop a user's cached entry after their account or roles change."""
+    _user_cache.pop(user_id)
+
+
+def _load_user(db: Session, user_id: int) -> Optional[Tuple[User, Tuple[str, ...]]]:
+    """Return (user, active role names), from the cache when possible."""
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
+    # User.roles is selectin-loaded by default
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    
+    role_names = tuple(role.name for role in user.roles if role.is_active)
+    
+    # Detach so the cached instances aren't expired or modified by this
+    # request's session once it commits
+    for role in user.roles:
+        db.expunge(role)
+    db.expunge(user)
+    
+    entry = (user, role_names)
+    _user_cache.set(user_id, entry)
+    return entry
+
+
+def _load_user_with_own_session(user_id: int) -> Optional[Tuple[User, Tuple[str, ...]]]:
+    """_load_user for callers that don't hold a request session."""
+    db = SessionLocal()
+    try:
+        return _load_user(db, user_id)
+    finally:
+        db.close()
+
+
+async def get_current_user_with_roles(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Tuple[User, Tuple[str, ...]]:
     """
-    Get current authenticated user from JWT token.
+    Get current authenticated user and their active role names from JWT token.
     """
     try:
         # Verify token
@@ -37,16 +88,18 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Get user from database
-        user = UserCRUD.get_user(db, user_id=user_id)
-        if user is None or not user.is_active:
+        # Get user from cache, falling back to the database in the threadpool
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            entry = await run_in_threadpool(_load_user, db, user_id)
+        if entry is None or not entry[0].is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found or inactive",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return user
+        return entry
     
     except HTTPException:
         raise
@@ -58,7 +111,16 @@ def get_current_user(
         )
 
 
-def get_current_active_user(
+async def get_current_user(
+    current: Tuple[User, Tuple[str, ...]] = Depends(get_current_user_with_roles)
+) -> User:
+    """
+    Get current authenticated user from JWT token.
+    """
+    return current[0]
+
+
+async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
@@ -68,7 +130,7 @@ def get_current_active_user(
     return current_user
 
 
-def get_current_verified_user(
+async def get_current_verified_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
@@ -91,11 +153,11 @@ def require_role(required_role: str):
         def admin_endpoint(user: User = Depends(require_role("admin"))):
             return {"message": "Admin access granted"}
     """
-    def role_checker(
-        current_user: User = Depends(get_current_user),
+    async def role_checker(
+        current: Tuple[User, Tuple[str, ...]] = Depends(get_current_user_with_roles),
         db: Session = Depends(get_db)
     ) -> User:
-        user_roles = [role.name for role in current_user.roles if role.is_active]
+        current_user, user_roles = current
         
         if not PermissionChecker.has_role(user_roles, required_role):
             raise HTTPException(
@@ -117,11 +179,16 @@ def require_permission(required_permission: str):
         def list_users(user: User = Depends(require_permission("read:users"))):
             return {"users": []}
     """
-    def permission_checker(
+    async def permission_checker(
+        request: Request,
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
     ) -> User:
-        user_permissions = UserCRUD.get_user_permissions(db, current_user.id)
+        # Resolved once per request, however many permission checks it runs
+        user_permissions = getattr(request.state, "user_permissions", None)
+        if user_permissions is None:
+            user_permissions = await run_in_threadpool(UserCRUD.get_user_permissions, db, current_user.id)
+            request.state.user_permissions = user_permissions
         
         if not PermissionChecker.has_permission(user_permissions, required_permission):
             raise HTTPException(
@@ -138,11 +205,11 @@ def require_admin():
     """
     Dependency to require admin role.
     """
-    def admin_checker(
-        current_user: User = Depends(get_current_user),
+    async def admin_checker(
+        current: Tuple[User, Tuple[str, ...]] = Depends(get_current_user_with_roles),
         db: Session = Depends(get_db)
     ) -> User:
-        user_roles = [role.name for role in current_user.roles if role.is_active]
+        current_user, user_roles = current
         
         if not PermissionChecker.is_admin(user_roles):
             raise HTTPException(
@@ -170,17 +237,25 @@ def require_self_or_admin(user_id_param: str = "user_id"):
         ):
             return {"user_id": user_id}
     """
-    def self_or_admin_checker(
-        path_user_id: int,
-        current_user: User = Depends(get_current_user),
+    async def self_or_admin_checker(
+        request: Request,
+        current: Tuple[User, Tuple[str, ...]] = Depends(get_current_user_with_roles),
         db: Session = Depends(get_db)
     ) -> User:
+        current_user, user_roles = current
+        
+        # Read the id from the route's own path parameter (a bare `path_user_id`
+        # argument would be treated as a required query parameter)
+        try:
+            path_user_id = int(request.path_params[user_id_param])
+        except (KeyError, ValueError):
+            path_user_id = None
+        
         # Check if user is accessing their own resource
         if current_user.id == path_user_id:
             return current_user
         
-        # Check if user is admin
-        user_roles = [role.name for role in current_user.roles if role.is_active]
+        # Check if user is admin (role names come from the cached auth entry)
         if PermissionChecker.is_admin(user_roles):
             return current_user
         
@@ -193,13 +268,15 @@ def require_self_or_admin(user_id_param: str = "user_id"):
 
 
 # Optional authentication - for endpoints that can work with or without auth
-def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+async def get_current_user_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
 ) -> Optional[User]:
     """
     Get current user if authenticated, otherwise return None.
     Useful for endpoints that can work with or without authentication.
+    
+    Doesn't depend on get_db: anonymous requests never check out a
+    connection, and a session is only opened on a user-cache miss.
     """
     if not credentials:
         return None
@@ -211,11 +288,13 @@ def get_current_user_optional(
         if user_id is None:
             return None
         
-        user = UserCRUD.get_user(db, user_id=user_id)
-        if user is None or not user.is_active:
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            entry = await run_in_threadpool(_load_user_with_own_session, user_id)
+        if entry is None or not entry[0].is_active:
             return None
         
-        return user
+        return entry[0]
     
     except Exception:
         return None
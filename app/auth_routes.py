@@ -3,12 +3,13 @@ Authentication and User Management API Routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import engine, get_db
 from app.models import User, Role, Permission
 from app.auth_schemas import (
     UserCreate, UserUpdate, UserResponse, 
@@ -21,14 +22,15 @@ from app.auth_crud import UserCRUD, RoleCRUD, PermissionCRUD
 from app.auth_utils import AuthUtils, Permissions, Roles
 from app.auth_dependencies import (
     get_current_user, get_current_active_user, get_current_verified_user,
-    require_role, require_permission, require_admin, require_self_or_admin
+    require_role, require_permission, require_admin, require_self_or_admin,
+    invalidate_cached_user
 )
 
 
-# Create router
-auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
-user_router = APIRouter(prefix="/users", tags=["User Management"])  
-admin_router = APIRouter(prefix="/admin", tags=["Admin"])
+# Create router (orjson encodes the datetime-heavy user/role payloads natively)
+auth_router = APIRouter(prefix="/auth", tags=["Authentication"], default_response_class=ORJSONResponse)
+user_router = APIRouter(prefix="/users", tags=["User Management"], default_response_class=ORJSONResponse)
+admin_router = APIRouter(prefix="/admin", tags=["Admin"], default_response_class=ORJSONResponse)
 
 
 # ================ Authentication Routes ================
@@ -42,21 +44,7 @@ def register_user(
     try:
         db_user = UserCRUD.create_user(db, user)
         
-        # Convert roles to simple list of names for response
-        role_names = [role.name for role in db_user.roles if role.is_active]
-        
-        return UserResponse(
-            id=db_user.id,
-            email=db_user.email,
-            phone=db_user.phone,
-            full_name=db_user.full_name,
-            login_count=db_user.login_count,
-            is_active=db_user.is_active,
-            is_verified=db_user.is_verified,
-            created_at=db_user.created_at,
-            last_login=db_user.last_login,
-            roles=role_names
-        )
+        return UserResponse.model_validate(db_user)
     except HTTPException:
         raise
     except Exception as e:
@@ -81,6 +69,9 @@ def login_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # login_count/last_login changed, so /me must not serve the cached copy
+    invalidate_cached_user(user.id)
+    
     # Create access token
     access_token_expires = timedelta(minutes=30)  # Or from config
     access_token = AuthUtils.create_access_token(
@@ -89,19 +80,7 @@ def login_user(
     )
     
     # Prepare user response
-    role_names = [role.name for role in user.roles if role.is_active]
-    user_response = UserResponse(
-        id=user.id,
-        email=user.email,
-        phone=user.phone,
-        full_name=user.full_name,
-        login_count=user.login_count,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        last_login=user.last_login,
-        roles=role_names
-    )
+    user_response = UserResponse.model_validate(user)
     
     return LoginResponse(
         access_token=access_token,
@@ -115,20 +94,7 @@ def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information."""
-    role_names = [role.name for role in current_user.roles if role.is_active]
-    
-    return UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        phone=current_user.phone,
-        full_name=current_user.full_name,
-        login_count=current_user.login_count,
-        is_active=current_user.is_active,
-        is_verified=current_user.is_verified,
-        created_at=current_user.created_at,
-        last_login=current_user.last_login,
-        roles=role_names
-    )
+    return UserResponse.model_validate(current_user)
 
 
 @auth_router.post("/change-password")
@@ -144,6 +110,7 @@ def change_password(
         password_change.current_password,
         password_change.new_password
     )
+    invalidate_cached_user(current_user.id)
     
     if success:
         return {"message": "Password changed successfully"}
@@ -165,25 +132,12 @@ def list_users(
     db: Session = Depends(get_db)
 ):
     """List users (requires read:users permission)."""
-    users = UserCRUD.get_users(db, skip=skip, limit=limit, active_only=active_only)
-    
-    response = []
-    for user in users:
-        role_names = [role.name for role in user.roles if role.is_active]
-        response.append(UserResponse(
-            id=user.id,
-            email=user.email,
-            phone=user.phone,
-            full_name=user.full_name,
-            login_count=user.login_count,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at,
-            last_login=user.last_login,
-            roles=role_names
-        ))
+    users = UserCRUD.get_users_with_role_names(db, skip=skip, limit=limit, active_only=active_only)
     
-    return response
+    return [
+        UserResponse.model_validate(user).model_copy(update={"roles": role_names})
+        for user, role_names in users
+    ]
 
 
 @user_router.get("/{user_id}", response_model=UserResponse)
@@ -200,20 +154,7 @@ def get_user(
             detail="User not found"
         )
     
-    role_names = [role.name for role in user.roles if role.is_active]
-    
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        phone=user.phone,
-        full_name=user.full_name,
-        login_count=user.login_count,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        last_login=user.last_login,
-        roles=role_names
-    )
+    return UserResponse.model_validate(user)
 
 
 @user_router.put("/{user_id}", response_model=UserResponse)
@@ -225,21 +166,9 @@ def update_user(
 ):
     """Update user information (self or admin access)."""
     updated_user = UserCRUD.update_user(db, user_id, user_update)
+    invalidate_cached_user(user_id)
     
-    role_names = [role.name for role in updated_user.roles if role.is_active]
-    
-    return UserResponse(
-        id=updated_user.id,
-        email=updated_user.email,
-        phone=updated_user.phone,
-        full_name=updated_user.full_name,
-        login_count=updated_user.login_count,
-        is_active=updated_user.is_active,
-        is_verified=updated_user.is_verified,
-        created_at=updated_user.created_at,
-        last_login=updated_user.last_login,
-        roles=role_names
-    )
+    return UserResponse.model_validate(updated_user)
 
 
 @user_router.delete("/{user_id}")
@@ -250,6 +179,7 @@ def delete_user(
 ):
     """Delete user (requires delete:users permission)."""
     success = UserCRUD.delete_user(db, user_id)
+    invalidate_cached_user(user_id)
     if success:
         return {"message": "User deleted successfully"}
     else:
@@ -337,6 +267,7 @@ def assign_role_to_user(
 ):
     """Assign role to user (requires admin access)."""
     success = UserCRUD.assign_role_to_user(db, assignment.user_id, assignment.role_id)
+    invalidate_cached_user(assignment.user_id)
     if success:
         return {"message": "Role assigned successfully"}
     else:
@@ -374,3 +305,21 @@ def get_user_permissions(
     """Get all permissions for a specific user (requires admin access)."""
     permissions = UserCRUD.get_user_permissions(db, user_id)
     return {"user_id": user_id, "permissions": permissions}
+
+
+@admin_router.get("/db-pool")
+def get_db_pool_status(current_user: User = Depends(require_admin())):
+    """
+    Connection pool occupancy of this worker (requires admin access).
+    
+    Checked-out and overflow counts make connection leaks and pool
+    exhaustion visible before they turn into timeouts.
+    """
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool counts overflow from -size until the pool is full
+        "overflow": max(pool.overflow(), 0),
+    }
@@ -60,6 +60,15 @@ class UserResponse(BaseModel):
     last_login: Optional[datetime] = None
     roles: List[str] = []  # Just role names for simplicity
 
+    @validator('roles', pre=True)
+    def active_role_names(cls, v):
+        # Accept User.roles directly so UserResponse.model_validate(user) works
+        return [
+            role if isinstance(role, str) else role.name
+            for role in v
+            if isinstance(role, str) or role.is_active
+        ]
+
     class Config:
         from_attributes = True
 
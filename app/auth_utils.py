@@ -5,32 +5,118 @@ Authentication utilities for password hashing, JWT tokens, and security function
 import jwt
 import bcrypt
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from passlib.context import CryptContext
+from typing import Optional, Dict, Any, Iterable
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
 import secrets
+import hashlib
+import hmac
 import os
+import re
+import time
 from fastapi import HTTPException, status
 
+from app.utils.cache import LockedTTLCache
+
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")  
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# One configured codec and a pre-encoded key, instead of PyJWT's module-level
+# helpers rebuilding options and re-encoding the secret on every call
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+_JWT = jwt.PyJWT(options={"require": ["exp", "sub"]})
+_MAX_JWT_HEADER_LENGTH = 512  # base64url characters
+
+# Password hashing: new hashes use Argon2id (m=64MiB, t=2, p=1 by default);
+# bcrypt hashes from before the switch still verify. The costs can be lowered
+# through the environment for tests and local development.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+# Optional server-side pepper: when PASSWORD_PEPPER is set, passwords are
+# HMAC-SHA256'd under it before Argon2 sees them, so a leaked users table
+# alone can't be brute-forced. Changing it invalidates existing Argon2 hashes;
+# legacy bcrypt hashes predate it and are verified unpeppered.
+_PASSWORD_PEPPER = os.getenv("PASSWORD_PEPPER", "").encode()
+_password_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+    type=Type.ID,
+)
+
+# Successful verifications are remembered briefly so a client logging in
+# repeatedly (e.g. during token refresh) doesn't pay for a full hash each
+# time. Keys are HMACs under a per-process secret, never the password itself.
+_VERIFY_CACHE_TTL = 60
+_verify_cache = LockedTTLCache(maxsize=4096, ttl=_VERIFY_CACHE_TTL)
+_verify_cache_secret = secrets.token_bytes(32)
+
+# Decoded JWT payloads keyed by the token's SHA-256, so each request doesn't
+# re-run signature checking and JSON parsing; entries are still rejected once
+# the token's own exp has passed. The key has to come from the raw token: a jti
+# read from a not-yet-verified token could be copied into a forged one.
+_payload_cache = LockedTTLCache(maxsize=10_000, ttl=30)
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NONDIGIT_RE = re.compile(r'\D')
+
+
+def _peppered(password: str) -> bytes:
+    """The Argon2 input for a password: its HMAC under the pepper, if one is set."""
+    if not _PASSWORD_PEPPER:
+        return password.encode()
+    return hmac.new(_PASSWORD_PEPPER, password.encode(), hashlib.sha256).digest()
 
 
 class AuthUtils:
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a password using bcrypt."""
-        return pwd_context.hash(password)
+        """Hash a (peppered) password using Argon2id."""
+        return _password_hasher.hash(_peppered(password))
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash."""
-        return pwd_context.verify(plain_password, hashed_password)
+        cache_key = hmac.new(
+            _verify_cache_secret,
+            f"{hashed_password}\0{plain_password}".encode(),
+            hashlib.sha256
+        ).digest()
+        if _verify_cache.get(cache_key):
+            return True
+        
+        # Call argon2-cffi / bcrypt directly rather than through a generic
+        # scheme-detecting wrapper
+        if hashed_password.startswith("$argon2"):
+            try:
+                verified = _password_hasher.verify(hashed_password, _peppered(plain_password))
+            except (VerificationError, InvalidHashError):
+                verified = False
+        else:
+            # Legacy bcrypt hashes were created without the pepper;
+            # needs_rehash flags them so login upgrades them to Argon2id
+            try:
+                verified = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+            except ValueError:
+                verified = False
+        
+        if verified:
+            _verify_cache.set(cache_key, True)
+        return verified
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """True for legacy bcrypt hashes or Argon2 hashes with outdated parameters."""
+        if not hashed_password.startswith("$argon2"):
+            return True
+        try:
+            return _password_hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
     
     @staticmethod
     def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -42,19 +128,37 @@ class AuthUtils:
         else:
             expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        # jti gives every token a short unique id (e.g. for a revocation list)
+        to_encode.update({
+            "exp": expire,
+            "iat": int(time.time()),
+            "jti": secrets.token_hex(16),
+        })
+        encoded_jwt = _JWT.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
         return encoded_jwt
     
     @staticmethod
     def verify_token(token: str) -> Dict[str, Any]:
         """Verify and decode a JWT token."""
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = _payload_cache.get(cache_key)
+        if cached is not None and cached.get("exp", 0) > time.time():
+            return dict(cached)
+        
+        # Reject obvious junk (scanners, truncated tokens, other algorithms)
+        # before paying for base64 decoding and the HMAC check
+        if not AuthUtils._looks_like_our_token(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = _JWT.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
             # Convert sub back to int for consistency with our database IDs
             if 'sub' in payload and isinstance(payload['sub'], str):
                 payload['sub'] = int(payload['sub'])
-            return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,6 +171,22 @@ class AuthUtils:
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        
+        # Only successfully decoded tokens are cached; callers get a copy so
+        # the shared payload can't be mutated
+        _payload_cache.set(cache_key, payload)
+        return dict(payload)
+    
+    @staticmethod
+    def _looks_like_our_token(token: str) -> bool:
+        """Cheap structural check: three segments, short header, our algorithm."""
+        if token.count(".") != 2 or token.index(".") >= _MAX_JWT_HEADER_LENGTH:
+            return False
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            return False
+        return header.get("alg") == ALGORITHM
     
     @staticmethod
     def generate_random_token(length: int = 32) -> str:
@@ -76,16 +196,13 @@ class AuthUtils:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Basic email validation."""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return _EMAIL_RE.match(email) is not None
     
     @staticmethod
     def validate_phone(phone: str) -> bool:
         """Basic phone validation."""
-        import re
         # Remove all non-digit characters
-        phone_digits = re.sub(r'\D', '', phone)
+        phone_digits = _NONDIGIT_RE.sub('', phone)
         # Check if it has 10-15 digits (international format)
         return 10 <= len(phone_digits) <= 15
 
@@ -94,36 +211,26 @@ class PermissionChecker:
     """Helper class to check user permissions."""
     
     @staticmethod
-    def has_permission(user_permissions: list, required_permission: str) -> bool:
+    def has_permission(user_permissions: Iterable[str], required_permission: str) -> bool:
         """
         Check if user has a specific permission.
         
         Args:
-            user_permissions: List of user's permission strings
+            user_permissions: Set (or iterable) of user's permission strings
             required_permission: Required permission in format 'action:resource'
         
         Returns:
             bool: True if user has permission, False otherwise
         """
-        # Check for exact match
-        if required_permission in user_permissions:
-            return True
+        perms = user_permissions if isinstance(user_permissions, (set, frozenset)) else set(user_permissions)
         
-        # Check for wildcard permissions (admin:all, etc.)
-        for permission in user_permissions:
-            if permission == "admin:all":
-                return True
-            
-            # Check for resource-level wildcard (like "write:all")
-            action, resource = required_permission.split(":", 1) 
-            if f"{action}:all" in user_permissions:
-                return True
-                
-            # Check for action-level wildcard (like "all:colleges")
-            if f"all:{resource}" in user_permissions:
-                return True
+        # Exact match or global admin wildcard
+        if required_permission in perms or "admin:all" in perms:
+            return True
         
-        return False
+        # Resource-level wildcard (like "write:all") or action-level wildcard (like "all:colleges")
+        action, resource = required_permission.split(":", 1)
+        return f"{action}:all" in perms or f"all:{resource}" in perms
     
     @staticmethod
     def has_role(user_roles: list, required_role: str) -> bool:
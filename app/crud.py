@@ -1,11 +1,56 @@
+from sqlalchemy import String, cast, delete, func, insert, select, text
 from sqlalchemy.orm import Session
 from app import models
 
-def get_top_colleges(db: Session, rank: int, caste: str, gender: str, limit=5):
-    query = db.query(models.Cutoff).filter(
-        models.Cutoff.category.contains(caste.upper()),
-        models.Cutoff.rank >= rank
+
+def refresh_ranked_colleges(db: Session) -> int:
+    """
+    Rebuild ranked_colleges from cutoffs in a single INSERT ... SELECT.
+    
+    One row per college, branch, year and stage holding its best (lowest)
+    cutoff rank; rank_position orders the colleges within each branch.
+    Branch names are copied from cutoffs as-is, not normalized, and every
+    existing row is replaced, so load_pdf_data.py only runs this when asked
+    (--rebuild-ranked-colleges). Returns the number of rows written.
+    """
+    Cutoff, College, RankedCollege = models.Cutoff, models.College, models.RankedCollege
+    best_rank = func.min(Cutoff.rank)
+    ranked = (
+        select(
+            Cutoff.college_id,
+            Cutoff.college_code,
+            College.name,
+            College.status,
+            Cutoff.branch,
+            cast(Cutoff.course_code, String),
+            best_rank,
+            func.row_number().over(
+                partition_by=(Cutoff.branch, Cutoff.year, Cutoff.stage),
+                order_by=best_rank,
+            ),
+            Cutoff.year,
+            Cutoff.stage,
+        )
+        .join(College, College.id == Cutoff.college_id)
+        .where(Cutoff.rank.isnot(None), Cutoff.branch.isnot(None))
+        .group_by(
+            Cutoff.college_id, Cutoff.college_code, College.name, College.status,
+            Cutoff.branch, Cutoff.course_code, Cutoff.year, Cutoff.stage,
+        )
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("TRUNCATE ranked_colleges RESTART IDENTITY"))
+    else:
+        db.execute(delete(RankedCollege))
+    result = db.execute(
+        insert(RankedCollege).from_select(
+            [
+                "college_id", "college_code", "college_name", "college_status",
+                "branch", "branch_code", "cutoff_rank", "rank_position", "year", "stage",
+            ],
+            ranked,
+        )
     )
-    if gender.lower() == "female":
-        query = query.filter(models.Cutoff.category.contains("L"))
-    return query.order_by(models.Cutoff.rank.asc()).limit(limit).all()
+    db.commit()
+    return result.rowcount
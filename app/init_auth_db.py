@@ -3,78 +3,92 @@ Database initialization script for authentication system.
 Creates default roles, permissions, and admin user.
 """
 
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
-from app.models import Base, User, Role, Permission
-from app.auth_crud import UserCRUD, RoleCRUD, PermissionCRUD
-from app.auth_schemas import UserCreate, RoleCreate, PermissionCreate
+from app.models import Base, User, Role, Permission, role_permissions, user_roles
+from app.auth_crud import UserCRUD
 from app.auth_utils import Permissions, Roles, AuthUtils
 
+log = logging.getLogger(__name__)
+
+
+def _seed_by_name(db: Session, model, rows: list):
+    """
+    Insert the rows whose name isn't taken yet; rows are dicts of column values.
+    
+    Returns ({name: instance} for every row, names inserted by this call).
+    On Postgres ON CONFLICT DO NOTHING lets the database skip existing names
+    in the INSERT itself; elsewhere the existing names are prefetched once.
+    """
+    names = [row["name"] for row in rows]
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(model).on_conflict_do_nothing(index_elements=["name"])
+        by_name = {obj.name: obj for obj in db.scalars(stmt.returning(model), rows)}
+        created = set(by_name)
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            by_name.update(
+                (obj.name, obj) for obj in db.scalars(select(model).where(model.name.in_(missing)))
+            )
+        return by_name, created
+    
+    by_name = {obj.name: obj for obj in db.scalars(select(model).where(model.name.in_(names)))}
+    new_rows = [row for row in rows if row["name"] not in by_name]
+    created = set()
+    if new_rows:
+        for obj in db.scalars(insert(model).returning(model), new_rows):
+            by_name[obj.name] = obj
+            created.add(obj.name)
+    return by_name, created
+
+
+# Default permissions as (resource, action, name, description)
+PERMISSION_ROWS = [
+    # College data permissions
+    ("colleges", "read", Permissions.READ_COLLEGES, "Read college data"),
+    ("colleges", "write", Permissions.WRITE_COLLEGES, "Write/update college data"),
+    ("colleges", "delete", Permissions.DELETE_COLLEGES, "Delete college data"),
+    
+    # User management permissions
+    ("users", "read", Permissions.READ_USERS, "Read user data"),
+    ("users", "write", Permissions.WRITE_USERS, "Write/update user data"),
+    ("users", "delete", Permissions.DELETE_USERS, "Delete users"),
+    
+    # Role and permission management
+    ("roles", "read", Permissions.READ_ROLES, "Read roles"),
+    ("roles", "write", Permissions.WRITE_ROLES, "Write/update roles"),
+    ("roles", "delete", Permissions.DELETE_ROLES, "Delete roles"),
+    
+    ("permissions", "read", Permissions.READ_PERMISSIONS, "Read permissions"),
+    ("permissions", "write", Permissions.WRITE_PERMISSIONS, "Write/update permissions"),
+    ("permissions", "delete", Permissions.DELETE_PERMISSIONS, "Delete permissions"),
+    
+    # Admin permissions
+    ("admin", "all", Permissions.ADMIN_ALL, "Full admin access"),
+    
+    # System permissions
+    ("analytics", "read", Permissions.READ_ANALYTICS, "Read analytics data"),
+    ("analytics", "write", Permissions.WRITE_ANALYTICS, "Write analytics data"),
+]
+_PERMISSION_FIELDS = ("resource", "action", "name", "description")
+
 
 def init_permissions(db: Session):
     """Initialize default permissions."""
-    default_permissions = [
-        # College data permissions
-        {"name": Permissions.READ_COLLEGES, "description": "Read college data", 
-         "resource": "colleges", "action": "read"},
-        {"name": Permissions.WRITE_COLLEGES, "description": "Write/update college data", 
-         "resource": "colleges", "action": "write"},
-        {"name": Permissions.DELETE_COLLEGES, "description": "Delete college data", 
-         "resource": "colleges", "action": "delete"},
-        
-        # User management permissions
-        {"name": Permissions.READ_USERS, "description": "Read user data", 
-         "resource": "users", "action": "read"},
-        {"name": Permissions.WRITE_USERS, "description": "Write/update user data", 
-         "resource": "users", "action": "write"},
-        {"name": Permissions.DELETE_USERS, "description": "Delete users", 
-         "resource": "users", "action": "delete"},
-        
-        # Role and permission management
-        {"name": Permissions.READ_ROLES, "description": "Read roles", 
-         "resource": "roles", "action": "read"},
-        {"name": Permissions.WRITE_ROLES, "description": "Write/update roles", 
-         "resource": "roles", "action": "write"},
-        {"name": Permissions.DELETE_ROLES, "description": "Delete roles", 
-         "resource": "roles", "action": "delete"},
-        
-        {"name": Permissions.READ_PERMISSIONS, "description": "Read permissions", 
-         "resource": "permissions", "action": "read"},
-        {"name": Permissions.WRITE_PERMISSIONS, "description": "Write/update permissions", 
-         "resource": "permissions", "action": "write"},
-        {"name": Permissions.DELETE_PERMISSIONS, "description": "Delete permissions", 
-         "resource": "permissions", "action": "delete"},
-        
-        # Admin permissions
-        {"name": Permissions.ADMIN_ALL, "description": "Full admin access", 
-         "resource": "admin", "action": "all"},
-        
-        # System permissions
-        {"name": Permissions.READ_ANALYTICS, "description": "Read analytics data", 
-         "resource": "analytics", "action": "read"},
-        {"name": Permissions.WRITE_ANALYTICS, "description": "Write analytics data", 
-         "resource": "analytics", "action": "write"},
-    ]
+    default_permissions = [dict(zip(_PERMISSION_FIELDS, row)) for row in PERMISSION_ROWS]
     
-    created_permissions = []
-    for perm_data in default_permissions:
-        try:
-            # Check if permission already exists
-            existing = PermissionCRUD.get_permission_by_name(db, perm_data["name"])
-            if existing:
-                print(f"Permission '{perm_data['name']}' already exists")
-                created_permissions.append(existing)
-                continue
-            
-            permission = PermissionCreate(**perm_data)
-            db_permission = PermissionCRUD.create_permission(db, permission)
-            print(f"Created permission: {db_permission.name}")
-            created_permissions.append(db_permission)
-            
-        except Exception as e:
-            print(f"Error creating permission '{perm_data['name']}': {e}")
-    
-    return created_permissions
+    existing, created = _seed_by_name(db, Permission, default_permissions)
+    for perm in default_permissions:
+        if perm["name"] in created:
+            log.debug("Created permission: %s", perm["name"])
+        else:
+            log.debug("Permission '%s' already exists", perm["name"])
+
+    return [existing[perm["name"]] for perm in default_permissions if perm["name"] in existing]
 
 
 def init_roles(db: Session, permissions: list):
@@ -118,38 +132,31 @@ def init_roles(db: Session, permissions: list):
         }
     ]
     
-    created_roles = []
+    existing, created = _seed_by_name(
+        db,
+        Role,
+        [{"name": role["name"], "description": role["description"]} for role in default_roles],
+    )
     for role_data in default_roles:
-        try:
-            # Check if role already exists
-            existing = RoleCRUD.get_role_by_name(db, role_data["name"])
-            if existing:
-                print(f"Role '{role_data['name']}' already exists")
-                created_roles.append(existing)
-                continue
-            
-            # Create role
-            role_create = RoleCreate(name=role_data["name"], description=role_data["description"])
-            db_role = RoleCRUD.create_role(db, role_create)
-            print(f"Created role: {db_role.name}")
-            
-            # Assign permissions to role
-            for perm_name in role_data["permissions"]:
-                if perm_name in perm_lookup:
-                    success = RoleCRUD.assign_permission_to_role(db, db_role.id, perm_lookup[perm_name].id)
-                    if success:
-                        print(f"  - Assigned permission '{perm_name}' to role '{db_role.name}'")
-                    else:
-                        print(f"  - Failed to assign permission '{perm_name}' to role '{db_role.name}'")
-                else:
-                    print(f"  - Permission '{perm_name}' not found")
-            
-            created_roles.append(db_role)
-            
-        except Exception as e:
-            print(f"Error creating role '{role_data['name']}': {e}")
-    
-    return created_roles
+        if role_data["name"] not in created:
+            log.debug("Role '%s' already exists", role_data["name"])
+    new_roles = [role for role in default_roles if role["name"] in created]
+
+    # Assign permissions to the new roles with a single executemany
+    assoc_rows = []
+    for role_data in new_roles:
+        db_role = existing[role_data["name"]]
+        log.debug("Created role: %s", db_role.name)
+        for perm_name in role_data["permissions"]:
+            if perm_name in perm_lookup:
+                assoc_rows.append({"role_id": db_role.id, "permission_id": perm_lookup[perm_name].id})
+                log.debug("  - Assigned permission '%s' to role '%s'", perm_name, db_role.name)
+            else:
+                log.warning("  - Permission '%s' not found", perm_name)
+    if assoc_rows:
+        db.execute(role_permissions.insert(), assoc_rows)
+
+    return [existing[role["name"]] for role in default_roles if role["name"] in existing]
 
 
 def create_admin_user(db: Session):
@@ -159,50 +166,45 @@ def create_admin_user(db: Session):
     # Check if admin user already exists
     existing_admin = UserCRUD.get_user_by_email(db, admin_email)
     if existing_admin:
-        print(f"Admin user '{admin_email}' already exists")
+        log.info("Admin user '%s' already exists", admin_email)
         return existing_admin
     
-    # Create admin user
-    admin_user_data = UserCreate(
-        email=admin_email,
-        phone="+919999999999",
-        full_name="System Administrator",
-        password="admin123456"  # Change this in production!
-    )
+    # Trusted constant seed data: no UserCreate validation pass needed
+    admin_password = "admin123456"  # Change this in production!
     
+    # Savepoint so a failed admin insert doesn't discard the seeded roles
+    savepoint = db.begin_nested()
     try:
-        # Create user without assigning default role (we'll assign admin role)
-        admin_user = User(
-            email=admin_user_data.email,
-            phone=admin_user_data.phone,
-            password_hash=AuthUtils.hash_password(admin_user_data.password),
-            full_name=admin_user_data.full_name,
-            login_count=0,
-            is_active=True,
-            is_verified=True  # Pre-verify admin user
-        )
-        
-        db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+        # Create user without assigning default role (we'll assign admin role);
+        # RETURNING hands back the row, server defaults included, in one trip
+        admin_user = db.scalars(
+            insert(User).returning(User),
+            [{
+                "email": admin_email,
+                "phone": "+919999999999",
+                "password_hash": AuthUtils.hash_password(admin_password),
+                "full_name": "System Administrator",
+                "is_verified": True,  # Pre-verify admin user
+            }],
+        ).one()
         
         # Assign super_admin role
-        super_admin_role = RoleCRUD.get_role_by_name(db, Roles.SUPER_ADMIN)
-        if super_admin_role:
-            success = UserCRUD.assign_role_to_user(db, admin_user.id, super_admin_role.id)
-            if success:
-                print(f"Assigned super_admin role to user '{admin_user.email}'")
-            else:
-                print(f"Failed to assign super_admin role to user '{admin_user.email}'")
+        super_admin_role_id = db.scalar(select(Role.id).where(Role.name == Roles.SUPER_ADMIN))
+        if super_admin_role_id is not None:
+            db.execute(user_roles.insert().values(user_id=admin_user.id, role_id=super_admin_role_id))
+            log.debug("Assigned super_admin role to user '%s'", admin_user.email)
+        else:
+            log.warning("Failed to assign super_admin role to user '%s'", admin_user.email)
+        savepoint.commit()
         
-        print(f"Created admin user: {admin_user.email}")
-        print(f"Default password: admin123456 (CHANGE THIS IN PRODUCTION!)")
+        log.info("Created admin user: %s", admin_user.email)
+        log.warning("Default password: admin123456 (CHANGE THIS IN PRODUCTION!)")
         
         return admin_user
         
     except Exception as e:
-        print(f"Error creating admin user: {e}")
-        db.rollback()
+        log.error("Error creating admin user: %s", e)
+        savepoint.rollback()
         return None
 
 
@@ -214,27 +216,27 @@ def init_database():
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
     
-    # Create database session
-    db = SessionLocal()
-    
     try:
-        # Initialize permissions
-        print("\n--- Initializing Permissions ---")
-        permissions = init_permissions(db)
-        
-        # Initialize roles
-        print("\n--- Initializing Roles ---")
-        roles = init_roles(db, permissions)
-        
-        # Create admin user
-        print("\n--- Creating Admin User ---")
-        admin_user = create_admin_user(db)
+        # Seed everything in one transaction: a single commit at the end
+        with SessionLocal.begin() as db:
+            # Initialize permissions
+            print("\n--- Initializing Permissions ---")
+            permissions = init_permissions(db)
+            
+            # Initialize roles
+            print("\n--- Initializing Roles ---")
+            roles = init_roles(db, permissions)
+            
+            # Create admin user
+            print("\n--- Creating Admin User ---")
+            admin_user = create_admin_user(db)
+            admin_email = admin_user.email if admin_user else None
         
         print("\n--- Database initialization completed! ---")
         print(f"Created {len(permissions)} permissions")
         print(f"Created {len(roles)} roles")
-        if admin_user:
-            print(f"Created admin user: {admin_user.email}")
+        if admin_email:
+            print(f"Created admin user: {admin_email}")
         
         print("\nDefault admin credentials:")
         print("Email: admin@collegeconnect.com")
@@ -243,10 +245,7 @@ def init_database():
         
     except Exception as e:
         print(f"Error during database initialization: {e}")
-        db.rollback()
-    finally:
-        db.close()
-
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     init_database()
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Table, Index, DDL, MetaData, Enum, event
+from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 from app.database import Base
 from sqlalchemy import UniqueConstraint
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 class College(Base):
     __tablename__ = "colleges"
@@ -22,6 +22,12 @@ class College(Base):
         UniqueConstraint('code', 'name', 'status', name='unique_college_code_name_status'),
     )
 
+# Low-cardinality cutoff attributes; a native enum on Postgres is 4 bytes per
+# value instead of a VARCHAR, and the application keeps reading plain strings
+CUTOFF_GENDER = Enum("male", "female", name="cutoff_gender")
+CUTOFF_LEVEL = Enum("home", "other", "state", "all india", name="cutoff_level")
+CUTOFF_STAGE = Enum("Stage-I", "Stage-II", name="cutoff_stage")
+
 class Cutoff(Base):
     __tablename__ = "cutoffs"
 
@@ -33,14 +39,96 @@ class Cutoff(Base):
     category = Column(String)
     rank = Column(Integer, nullable=True)
     percent = Column(Float, nullable=True)
-    gender = Column(String)
-    level = Column(String)  # Home/Other/State level
+    gender = Column(CUTOFF_GENDER)
+    level = Column(CUTOFF_LEVEL)  # Home/Other/State level
     year = Column(Integer, nullable=True)
-    stage = Column(String, nullable=True)
+    stage = Column(CUTOFF_STAGE, nullable=True)
     
     # Relationship with college
     college = relationship("College", back_populates="cutoffs")
 
+    @property
+    def college_name(self):
+        """College name, matching the column of the same name on CutoffSuggestion."""
+        return self.college.name
+
+    __table_args__ = (
+        # Equality filters first, then rank so ORDER BY rank LIMIT n reads straight off the index
+        Index("ix_cutoff_cat_level_rank", "category", "level", "rank"),
+        # college_name-filtered /recommend lookups start from the matching colleges and
+        # probe their cutoffs; Postgres does not index foreign keys on its own
+        Index("ix_cutoff_college_cat_rank", "college_id", "category", "rank"),
+        # text_pattern_ops so prefix LIKEs ('GOPEN%') can use a btree under any collation
+        Index(
+            "ix_cutoff_category_pattern",
+            "category",
+            postgresql_ops={"category": "text_pattern_ops"},
+        ),
+        # Plain btree so the branch catalog (SELECT trim(branch) ... UNION) can read
+        # branch names with an index-only scan instead of the whole heap
+        Index("ix_cutoff_branch", "branch"),
+        # Trigram index so branch ILIKE '%...%' searches don't scan the whole table
+        Index(
+            "ix_cutoff_branch_trgm",
+            "branch",
+            postgresql_using="gin",
+            postgresql_ops={"branch": "gin_trgm_ops"},
+        ),
+    )
+
+
+# gin_trgm_ops comes from the pg_trgm extension, which must exist before the index is created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# Denormalized cutoffs + college name, so suggestion queries don't JOIN per request.
+# Refresh after loading cutoffs (see refresh_cutoff_suggestions); the unique id
+# index is what allows REFRESH MATERIALIZED VIEW CONCURRENTLY.
+_CUTOFF_SUGGESTIONS_DDL = (
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS cutoff_suggestions AS
+    SELECT c.id, c.college_id, c.rank, c.category, c.level, c.branch, c.percent,
+           c.gender, c.year, c.stage, col.name AS college_name
+    FROM cutoffs c
+    JOIN colleges col ON c.college_id = col.id
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_cutoff_suggestions_id ON cutoff_suggestions (id)",
+    "CREATE INDEX IF NOT EXISTS ix_cutoff_suggestions_cat_level_rank ON cutoff_suggestions (category, level, rank)",
+    "CREATE INDEX IF NOT EXISTS ix_cutoff_suggestions_college_rank ON cutoff_suggestions (college_name, rank)",
+    "CREATE INDEX IF NOT EXISTS ix_cutoff_suggestions_branch_rank ON cutoff_suggestions (branch, rank)",
+)
+
+for _statement in _CUTOFF_SUGGESTIONS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS cutoff_suggestions").execute_if(dialect="postgresql"),
+)
+
+# The view lives on its own metadata so create_all never tries to create it as a table
+ViewBase = declarative_base(metadata=MetaData())
+
+class CutoffSuggestion(ViewBase):
+    """Read-only mapping of the cutoff_suggestions materialized view."""
+    __tablename__ = "cutoff_suggestions"
+
+    id = Column(Integer, primary_key=True)
+    college_id = Column(Integer)
+    rank = Column(Integer)
+    category = Column(String)
+    level = Column(CUTOFF_LEVEL)
+    branch = Column(String)
+    percent = Column(Float)
+    gender = Column(CUTOFF_GENDER)
+    year = Column(Integer)
+    stage = Column(CUTOFF_STAGE)
+    college_name = Column(String)
+
 class RankedCollege(Base):
     __tablename__ = "ranked_colleges"
 
@@ -49,13 +137,18 @@ class RankedCollege(Base):
     college_code = Column(Integer, nullable=False)
     college_name = Column(String, nullable=False)
     college_status = Column(String, nullable=True)
-    branch = Column(String, nullable=False)  # Normalized branch name
+    branch = Column(String, nullable=False)  # As in cutoffs when built by crud.refresh_ranked_colleges
     branch_code = Column(String, nullable=False)
     cutoff_rank = Column(Integer, nullable=False)
     rank_position = Column(Integer, nullable=False)
     year = Column(Integer, nullable=True)
     stage = Column(String, nullable=True)
 
+    __table_args__ = (
+        # Branch catalog reads, as on cutoffs
+        Index("ix_ranked_branch", "branch"),
+    )
+
 
 # Association tables for many-to-many relationships
 user_roles = Table(
@@ -81,15 +174,29 @@ class User(Base):
     phone = Column(String, unique=True, index=True, nullable=True)
     password_hash = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
-    login_count = Column(Integer, default=0, nullable=False)  # Counter for login attempts
-    is_active = Column(Boolean, default=True, nullable=False)
-    is_verified = Column(Boolean, default=False, nullable=False)
+    # Python-side defaults are sent with every INSERT, so databases created
+    # before the server_defaults existed (create_all never alters a table)
+    # still accept new rows; the server_defaults cover raw SQL inserts
+    login_count = Column(Integer, default=0, server_default=text("0"), nullable=False)  # Counter for login attempts
+    is_active = Column(Boolean, default=True, server_default=text("true"), nullable=False)
+    is_verified = Column(Boolean, default=False, server_default=text("false"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     last_login = Column(DateTime(timezone=True), nullable=True)
     
-    # Many-to-many relationship with roles
-    roles = relationship("Role", secondary=user_roles, back_populates="users")
+    # Many-to-many relationship with roles; nearly every User load (auth checks,
+    # UserResponse) needs the role names, so fetch them with one IN query
+    roles = relationship("Role", secondary=user_roles, back_populates="users", lazy="selectin")
+
+    __table_args__ = (
+        # Logins match emails case-insensitively on lower(email)
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        # Range scans for "active since ..." analytics; never-logged-in users stay out of it
+        Index("ix_users_last_login", "last_login", postgresql_where=last_login.isnot(None)),
+    )
+    # Fetch server-side defaults in the INSERT itself (RETURNING) rather than
+    # with a follow-up SELECT on first access
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class Role(Base):
@@ -99,12 +206,18 @@ class Role(Base):
     name = Column(String, unique=True, nullable=False, index=True)  # e.g., 'admin', 'user', 'moderator'
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    is_active = Column(Boolean, default=True, nullable=False)
+    is_active = Column(Boolean, default=True, server_default=text("true"), nullable=False)
     
     # Many-to-many relationships
     users = relationship("User", secondary=user_roles, back_populates="roles")
     permissions = relationship("Permission", secondary=role_permissions, back_populates="roles")
 
+    __table_args__ = (
+        # Only active roles take part in authorization checks
+        Index("ix_roles_name_active", "name", postgresql_where=is_active),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Permission(Base):
     __tablename__ = "permissions"
@@ -1,33 +1,113 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+import orjson
+import re
+from app.database import SessionLocal, get_db
 from app.schemas import (
     CollegeSuggestionRequest, 
+    CollegeSuggestionBatchRequest,
     CollegeSuggestionResponse, 
     CollegeStatistics
 )
-from app.crud import get_top_colleges
 from app.apis.college_suggestion import (
     get_suggested_colleges,
+    get_suggested_colleges_batch,
     get_college_details_by_rank,
-    get_college_statistics
+    get_college_statistics,
+    get_recommended_colleges
 )
 from app.auth_dependencies import get_current_user, require_permission
 from app.auth_utils import Permissions
 from app.models import User
-from typing import List, Optional
+from app.utils.branch_normalizer import NORMALIZER
+from app.utils.cache import LockedTTLCache
+from typing import Any, Callable, List, Optional
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Encoded bodies of the catalog endpoints (regions, branches, branch mappings).
+# They are DISTINCT scans plus Python clean-up over data that only changes when
+# cutoffs are reloaded, so they are served from here for up to an hour.
+_catalog_cache = LockedTTLCache(maxsize=8, ttl=3600)
+
+
+# Administrative prefixes stripped from region names. District is tried before
+# Dist and Tal. before Tal so the longer spelling wins; the group repeats so
+# stacked prefixes such as "Dist-Tal-" come off together.
+_REGION_PREFIX_RE = re.compile(r'^(?:District\s+|Dist[-\s]*|Tal\.\s*|Tal[-\s]*)+', re.IGNORECASE)
+
+# College names that were loaded into the region column by mistake
+_UNWANTED_REGIONS = frozenset({
+    "Atma Malik Institute Of Technology & Research",
+    "Ashokrao Mane Group of Institutions",
+})
+# Matched anywhere in the region, so one alternation scans each name once
+_UNWANTED_REGIONS_RE = re.compile("|".join(map(re.escape, sorted(_UNWANTED_REGIONS))))
+
+
+async def _cached_json(key: str, compute: Callable[[], Any]) -> Response:
+    """
+    Serve `compute()` as JSON, encoding it once per cache lifetime.
+    
+    Hits are answered on the event loop; only a miss runs the (blocking)
+    query in the threadpool.
+    """
+    body = _catalog_cache.get(key)
+    if body is None:
+        body = orjson.dumps(await run_in_threadpool(compute))
+        _catalog_cache.set(key, body)
+    return Response(content=body, media_type="application/json")
+
+async def _recommend_impl(
+    db: Session,
+    rank: int,
+    caste: str,
+    gender: str,
+    seat_type: str,
+    special_reservation: Optional[str] = None,
+    college_name: Optional[str] = None,
+    branch: Optional[str] = None,
+    limit: int = 20
+):
+    """Shared body of /recommend and /college-details."""
+    unfiltered = college_name is None and branch is None
+    if unfiltered:
+        # Unfiltered lookups are served from the rank-bucket cache as
+        # pre-encoded objects; returning a Response skips response_model
+        colleges = await run_in_threadpool(
+            get_recommended_colleges,
+            db, rank, caste, gender, seat_type, special_reservation, limit
+        )
+    else:
+        colleges = await run_in_threadpool(
+            get_college_details_by_rank,
+            db, rank, caste, gender, seat_type, college_name, branch, special_reservation, limit
+        )
+    
+    if not colleges:
+        raise HTTPException(
+            status_code=404, 
+            detail="No colleges found for the given criteria"
+        )
+    
+    if unfiltered:
+        return Response(content=b"[" + b",".join(colleges) + b"]", media_type="application/json")
+    
+    # response_model converts the rows straight from their attributes
+    return colleges
 
-router = APIRouter()
 
 # Updated endpoint using new get_suggested_colleges function
 @router.get("/recommend", response_model=List[CollegeSuggestionResponse])
-def recommend_colleges(
+async def recommend_colleges(
     rank: int = Query(..., description="Student's CET rank"),
     caste: str = Query(..., description="Student's caste category (OPEN, OBC, SC, ST, EWS, NT1, NT2, NT3, SBC, SEBC, VJ)"),
     gender: str = Query(..., description="Student's gender (MALE, FEMALE)"),
     seat_type: str = Query("H", description="Type of seat (H-Home, O-Other, S-State, AI-All India)"),
     special_reservation: Optional[str] = Query(None, description="Special reservation type (PWD, DEFENCE, ORPHAN, TFWS)"),
-    limit: int = Query(20, description="Maximum number of colleges to return"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of colleges to return"),
     current_user: User = Depends(require_permission(Permissions.READ_COLLEGES)),
     db: Session = Depends(get_db)
 ):
@@ -38,104 +118,58 @@ def recommend_colleges(
     Returns colleges where the student's rank is better than or equal to the cutoff rank,
     sorted by cutoff rank (lowest cutoff first).
     """
-    try:
-        # Use the same logic as college-details but without branch filtering and limit=20
-        colleges = get_college_details_by_rank(
-            db, rank, caste, gender, seat_type, 
-            college_name=None, branch=None, special_reservation=special_reservation, 
-            limit=20
-        )
-        
-        if not colleges:
-            raise HTTPException(
-                status_code=404, 
-                detail="No colleges found for the given criteria"
-            )
-        
-        # Convert to response format
-        response = []
-        for college in colleges:
-            response.append(CollegeSuggestionResponse(
-                college=college.college.name,  # Access college name through relationship
-                branch=college.branch,
-                category=college.category,
-                rank=college.rank,
-                percent=college.percent,
-                gender=college.gender,
-                level=college.level,
-                year=college.year,
-                stage=college.stage
-            ))
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    # Same logic as college-details but without college/branch filtering
+    return await _recommend_impl(
+        db, rank, caste, gender, seat_type, special_reservation=special_reservation, limit=limit
+    )
+
+
+def _distinct_branches(db: Session) -> List[str]:
+    """Trimmed branch names from cutoffs and ranked_colleges, deduplicated by the UNION."""
+    from app.models import RankedCollege, Cutoff
+    from sqlalchemy import func, select
+    
+    def trimmed(column):
+        branch = func.trim(column)
+        # Blank and single-character names are noise; drop them in SQL
+        return select(branch).where(func.length(branch) > 1)
+    
+    return db.execute(trimmed(Cutoff.branch).union(trimmed(RankedCollege.branch))).scalars().all()
+
+
+def _compute_branch_mappings(db: Session) -> dict:
+    unique_branches = _distinct_branches(db)
+    
+    # Get mappings with original and normalized names
+    branch_mappings = NORMALIZER.get_all_branches_with_normalized(unique_branches)
+    
+    # Format response
+    return {
+        "total_original_branches": len(unique_branches),
+        "total_normalized_branches": len(set(mapping[1] for mapping in branch_mappings)),
+        "mappings": [
+            {
+                "original": original,
+                "normalized": normalized
+            }
+            for original, normalized in branch_mappings
+        ]
+    }
 
 
 @router.get("/branch-mappings")
-def get_branch_mappings(db: Session = Depends(get_db)):
+async def get_branch_mappings(db: Session = Depends(get_db)):
     """
     Get detailed branch information showing original names and their normalized versions.
     Useful for debugging and understanding the normalization process.
     """
-    try:
-        from app.models import RankedCollege, Cutoff
-        from app.utils.branch_normalizer import BranchNormalizer
-        from sqlalchemy import distinct
-        
-        normalizer = BranchNormalizer()
-        
-        # Collect branches from both tables
-        all_branches = []
-        
-        # Get branches from cutoffs table
-        try:
-            cutoff_branches = db.query(distinct(Cutoff.branch)).all()
-            for b in cutoff_branches:
-                if b[0] and b[0].strip() and len(b[0].strip()) > 1:
-                    all_branches.append(b[0].strip())
-        except Exception as e:
-            print(f"Warning: Could not fetch branches from cutoffs table: {e}")
-        
-        # Get branches from ranked_colleges table  
-        try:
-            ranked_branches = db.query(distinct(RankedCollege.branch)).all()
-            for b in ranked_branches:
-                if b[0] and b[0].strip() and len(b[0].strip()) > 1:
-                    all_branches.append(b[0].strip())
-        except Exception as e:
-            print(f"Warning: Could not fetch branches from ranked_colleges table: {e}")
-        
-        # Remove duplicates
-        unique_branches = list(set(all_branches))
-        
-        # Get mappings with original and normalized names
-        branch_mappings = normalizer.get_all_branches_with_normalized(unique_branches)
-        
-        # Format response
-        response = {
-            "total_original_branches": len(unique_branches),
-            "total_normalized_branches": len(set(mapping[1] for mapping in branch_mappings)),
-            "mappings": [
-                {
-                    "original": original,
-                    "normalized": normalized
-                }
-                for original, normalized in branch_mappings
-            ]
-        }
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return await _cached_json("branch-mappings", lambda: _compute_branch_mappings(db))
 
 
 
 
 @router.get("/college-details", response_model=List[CollegeSuggestionResponse])
-def get_college_details(
+async def get_college_details(
     rank: int = Query(..., description="Student's CET rank"),
     caste: str = Query(..., description="Student's caste category"),
     gender: str = Query(..., description="Student's gender"),
@@ -143,53 +177,21 @@ def get_college_details(
     special_reservation: Optional[str] = Query(None, description="Special reservation type (PWD, DEFENCE, ORPHAN, TFWS)"),
     college_name: Optional[str] = Query(None, description="Specific college name"),
     branch: Optional[str] = Query(None, description="Specific branch name (can be normalized name like 'CS' or full name)"),
-    limit: int = Query(50, description="Maximum number of results to return"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of results to return"),
     current_user: User = Depends(require_permission(Permissions.READ_COLLEGES)),
     db: Session = Depends(get_db)
 ):
     """
     Get detailed cutoff information for specific college/branch combination.
-    Uses normalized branch names from ranked_colleges table for better search.
+    Branch filters match cutoff branch names and expand abbreviations like 'CS'.
     """
-    try:
-        colleges = get_college_details_by_rank(
-            db, rank, caste, gender, seat_type, college_name, branch, special_reservation, limit
-        )
-        
-        if not colleges:
-            raise HTTPException(
-                status_code=404, 
-                detail="No colleges found for the given criteria"
-            )
-        
-        # Convert to response format with normalized branch names
-        response = []
-        for college in colleges:
-            # Get normalized branch name if available
-            normalized_branch = college.branch
-            if hasattr(college, 'normalized_branch') and college.normalized_branch:
-                normalized_branch = college.normalized_branch
-            
-            response.append(CollegeSuggestionResponse(
-                college=college.college.name,  # Access college name through relationship
-                branch=normalized_branch,  # Use normalized branch name
-                category=college.category,
-                rank=college.rank,
-                percent=college.percent,
-                gender=college.gender,
-                level=college.level,
-                year=college.year,
-                stage=college.stage
-            ))
-        
-        return response
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return await _recommend_impl(
+        db, rank, caste, gender, seat_type, special_reservation, college_name, branch, limit
+    )
 
 
 @router.get("/college-statistics", response_model=CollegeStatistics)
-def get_statistics(
+async def get_statistics(
     rank: int = Query(..., description="Student's CET rank"),
     caste: str = Query(..., description="Student's caste category"),
     gender: str = Query(..., description="Student's gender"),
@@ -200,17 +202,13 @@ def get_statistics(
     """
     Get statistics about available colleges for the given student profile.
     """
-    try:
-        stats = get_college_statistics(db, rank, caste, gender, seat_type)
-        return CollegeStatistics(**stats)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    stats = await run_in_threadpool(get_college_statistics, db, rank, caste, gender, seat_type)
+    return CollegeStatistics(**stats)
 
 
 # POST endpoint for college suggestions
 @router.post("/suggest-colleges", response_model=List[CollegeSuggestionResponse])
-def suggest_colleges_post(
+async def suggest_colleges_post(
     request: CollegeSuggestionRequest,
     current_user: User = Depends(require_permission(Permissions.READ_COLLEGES)),
     db: Session = Depends(get_db)
@@ -222,136 +220,119 @@ def suggest_colleges_post(
     where the student's rank is better than or equal to the cutoff rank,
     sorted by cutoff rank (lowest cutoff first).
     """
-    try:
-        colleges = get_suggested_colleges(
-            db, 
-            request.rank, 
-            request.caste, 
-            request.gender, 
-            request.seat_type, 
-            request.special_reservation,
-            limit=20
+    colleges = await run_in_threadpool(
+        get_suggested_colleges,
+        db, 
+        request.rank, 
+        request.caste, 
+        request.gender, 
+        request.seat_type, 
+        request.special_reservation,
+        limit=20
+    )
+    
+    if not colleges:
+        raise HTTPException(
+            status_code=404, 
+            detail="No colleges found for the given criteria"
         )
+    
+    # response_model converts the rows straight from their attributes;
+    # college_name is denormalized in the cutoff_suggestions view
+    return colleges
+
+
+@router.post("/recommend-batch", response_model=List[List[CollegeSuggestionResponse]])
+async def suggest_colleges_batch(
+    request: CollegeSuggestionBatchRequest,
+    current_user: User = Depends(require_permission(Permissions.READ_COLLEGES)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get top colleges for several student profiles at once (e.g. trial ranks).
+    
+    Returns one list per entry in `queries`, in the same order and with the
+    same rules as /suggest-colleges; all profiles are answered by a single
+    database query. A profile with no matches gets an empty list.
+    """
+    return await run_in_threadpool(
+        get_suggested_colleges_batch,
+        db,
+        [
+            (q.rank, q.caste, q.gender, q.seat_type, q.special_reservation)
+            for q in request.queries
+        ],
+        limit=20
+    )
+
+
+def _compute_available_regions(db: Session) -> List[str]:
+    from app.models import College
+    from sqlalchemy import func, select
+    
+    # NULL and blank regions are dropped, and the rest trimmed, in SQL
+    region = func.trim(College.region)
+    regions = db.execute(select(region).distinct().where(func.length(region) > 0)).scalars()
+    
+    filtered_regions: set[str] = set()
+    for region_name in regions:
+        # Skip unwanted entries
+        if _UNWANTED_REGIONS_RE.search(region_name):
+            continue
         
-        if not colleges:
-            raise HTTPException(
-                status_code=404, 
-                detail="No colleges found for the given criteria"
-            )
-        
-        # Convert to response format
-        response = []
-        for college in colleges:
-            response.append(CollegeSuggestionResponse(
-                college=college.college.name,  # Access college name through relationship
-                branch=college.branch,
-                category=college.category,
-                rank=college.rank,
-                percent=college.percent,
-                gender=college.gender,
-                level=college.level,
-                year=college.year,
-                stage=college.stage
-            ))
+        # Clean up region names: strip "District"/"Dist-"/"Tal."/"Tal-"
+        # prefixes (case insensitive) in a single pass
+        region_name = _REGION_PREFIX_RE.sub('', region_name, count=1)
         
-        return response
+        # Clean up extra spaces and punctuation
+        region_name = region_name.strip()
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        if region_name:
+            filtered_regions.add(region_name)
+    
+    # Sort and return unique regions
+    return sorted(filtered_regions)
 
 
 @router.get("/available-regions", response_model=List[str])
-def get_available_regions(db: Session = Depends(get_db)):
+async def get_available_regions(db: Session = Depends(get_db)):
     """
     Get all available regions for college filtering.
     Excludes unwanted entries and cleans up region names.
     """
-    try:
-        from app.models import College
-        from sqlalchemy import distinct
-        import re
-        
-        regions = db.query(distinct(College.region)).all()
-        
-        # Filter out None values and unwanted entries
-        filtered_regions = []
-        for r in regions:
-            if r[0] and r[0].strip():
-                region_name = r[0].strip()
-                
-                # Skip unwanted entries
-                if any(unwanted in region_name for unwanted in [
-                    "Atma Malik Institute Of Technology & Research",
-                    "Ashokrao Mane Group of Institutions"
-                ]):
-                    continue
-                
-                # Clean up region names
-                # Remove "Dist-" prefix (case insensitive)
-                region_name = re.sub(r'^Dist[-\s]*', '', region_name, flags=re.IGNORECASE)
-                # Remove "Tal-" prefix (case insensitive)
-                region_name = re.sub(r'^Tal[-\s]*', '', region_name, flags=re.IGNORECASE)
-                # Remove "Tal." prefix (case insensitive)
-                region_name = re.sub(r'^Tal\.\s*', '', region_name, flags=re.IGNORECASE)
-                # Remove "District" prefix (case insensitive)
-                region_name = re.sub(r'^District\s+', '', region_name, flags=re.IGNORECASE)
-                
-                # Clean up extra spaces and punctuation
-                region_name = region_name.strip()
-                
-                if region_name and region_name not in filtered_regions:
-                    filtered_regions.append(region_name)
-        
-        # Sort and return unique regions
-        available_regions = sorted(list(set(filtered_regions)))
-        
-        return available_regions
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return await _cached_json("available-regions", lambda: _compute_available_regions(db))
+
+
+def _compute_available_branches(db: Session) -> List[str]:
+    unique_branches = _distinct_branches(db)
+    
+    # Normalize all branches and get unique normalized names
+    return NORMALIZER.get_normalized_branches(unique_branches)
 
 
 @router.get("/available-branches", response_model=List[str])
-def get_available_branches(db: Session = Depends(get_db)):
+async def get_available_branches(db: Session = Depends(get_db)):
     """
     Get all unique branch names, collecting from both cutoffs and ranked_colleges tables.
     Returns normalized branch names (e.g., Computer Science -> CSE) for better consistency.
     """
+    return await _cached_json("available-branches", lambda: _compute_available_branches(db))
+
+
+def warm_catalog_cache() -> None:
+    """
+    Fill the catalog cache at startup so the first requests don't pay for
+    the DISTINCT scans; failures are left for the endpoints to report.
+    """
+    db = SessionLocal()
     try:
-        from app.models import RankedCollege, Cutoff
-        from app.utils.branch_normalizer import BranchNormalizer
-        from sqlalchemy import distinct, union
-        
-        normalizer = BranchNormalizer()
-        
-        # Collect branches from both tables
-        all_branches = []
-        
-        # Get branches from cutoffs table
-        try:
-            cutoff_branches = db.query(distinct(Cutoff.branch)).all()
-            for b in cutoff_branches:
-                if b[0] and b[0].strip() and len(b[0].strip()) > 1:
-                    all_branches.append(b[0].strip())
-        except Exception as e:
-            print(f"Warning: Could not fetch branches from cutoffs table: {e}")
-        
-        # Get branches from ranked_colleges table  
-        try:
-            ranked_branches = db.query(distinct(RankedCollege.branch)).all()
-            for b in ranked_branches:
-                if b[0] and b[0].strip() and len(b[0].strip()) > 1:
-                    all_branches.append(b[0].strip())
-        except Exception as e:
-            print(f"Warning: Could not fetch branches from ranked_colleges table: {e}")
-        
-        # Remove duplicates
-        unique_branches = list(set(all_branches))
-        
-        # Normalize all branches and get unique normalized names
-        normalized_branches = normalizer.get_normalized_branches(unique_branches)
-        
-        return normalized_branches
-        
+        for key, compute in (
+            ("available-regions", _compute_available_regions),
+            ("available-branches", _compute_available_branches),
+            ("branch-mappings", _compute_branch_mappings),
+        ):
+            _catalog_cache.set(key, orjson.dumps(compute(db)))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        print(f"Warning: Could not warm the catalog cache: {e}")
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class CutoffOut(BaseModel):
@@ -23,9 +23,15 @@ class CollegeSuggestionRequest(BaseModel):
     special_reservation: Optional[str] = None  # "PWD", "DEFENCE", "ORPHAN", "TFWS"
 
 
+class CollegeSuggestionBatchRequest(BaseModel):
+    """Request schema for the batched college suggestion API"""
+    queries: list[CollegeSuggestionRequest] = Field(..., min_length=1, max_length=20)
+
+
 class CollegeSuggestionResponse(BaseModel):
     """Response schema for college suggestion API"""
-    college: str
+    # Read from `college_name` on Cutoff / CutoffSuggestion rows
+    college: str = Field(validation_alias="college_name")
     branch: str
     category: str
     rank: int  # This is the cutoff rank
@@ -36,7 +42,8 @@ class CollegeSuggestionResponse(BaseModel):
     stage: str
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+        populate_by_name = True
 
 
 class CollegeStatistics(BaseModel):
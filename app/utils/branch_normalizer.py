@@ -7,8 +7,13 @@ Examples:
 """
 
 import re
+import sys
 from typing import Dict, List, Tuple
 
+# Runs of common punctuation and whitespace, collapsed to one space by
+# BranchNormalizer._canonical
+_CLEAN_RE = re.compile(r'[&(),.\-\s]+')
+
 class BranchNormalizer:
     def __init__(self):
         # Dictionary mapping normalized names to their variations
@@ -158,11 +163,32 @@ class BranchNormalizer:
             ]
         }
         
+        # Abbreviations are interned so every result shares one string object
+        # and downstream dict/set lookups on them hit the identity fast path
+        self.branch_mappings = {
+            sys.intern(normalized): variations
+            for normalized, variations in self.branch_mappings.items()
+        }
+        
         # Create reverse mapping for quick lookup
         self.full_name_to_normalized = {}
         for normalized, variations in self.branch_mappings.items():
             for variation in variations:
                 self.full_name_to_normalized[variation.lower()] = normalized
+        
+        # Fuzzy matching is equality after punctuation/whitespace clean-up, so
+        # it is a second lookup keyed by the cleaned variation. setdefault
+        # keeps the first mapping on a collision, as the old scan in
+        # branch_mappings order did
+        self._canonical_to_normalized: Dict[str, str] = {}
+        for normalized, variations in self.branch_mappings.items():
+            for variation in variations:
+                self._canonical_to_normalized.setdefault(self._canonical(variation.lower()), normalized)
+        
+        # normalize_branch is a pure function of its input; remember results so
+        # repeated names (and repeated calls on a shared instance) skip the
+        # regex clean-up
+        self._normalized_cache: Dict[str, str] = {}
     
     def normalize_branch(self, branch_name: str) -> str:
         """
@@ -176,35 +202,31 @@ class BranchNormalizer:
         """
         if not branch_name:
             return branch_name
-            
+        
+        cached = self._normalized_cache.get(branch_name)
+        if cached is None:
+            cached = self._normalized_cache[branch_name] = self._normalize_uncached(branch_name)
+        return cached
+    
+    def _normalize_uncached(self, branch_name: str) -> str:
         branch_lower = branch_name.strip().lower()
         
         # Direct lookup
         if branch_lower in self.full_name_to_normalized:
             return self.full_name_to_normalized[branch_lower]
         
-        # Fuzzy matching for partial matches
-        for normalized, variations in self.branch_mappings.items():
-            for variation in variations:
-                if self._fuzzy_match(branch_lower, variation.lower()):
-                    return normalized
-        
-        # If no match found, return original (cleaned)
-        return branch_name.strip()
+        # Fuzzy matching for minor punctuation/spacing differences; if no
+        # match found, return original (cleaned)
+        return self._canonical_to_normalized.get(self._canonical(branch_lower), branch_name.strip())
     
-    def _fuzzy_match(self, branch_lower: str, variation_lower: str) -> bool:
+    @staticmethod
+    def _canonical(name_lower: str) -> str:
         """
-        Check if branch name fuzzy matches a variation.
+        Reduce a lower-cased branch name to the form fuzzy matching compares.
         This handles minor differences in punctuation, spacing, etc.
         """
-        # Remove common punctuation and extra spaces
-        branch_clean = re.sub(r'[&(),.-]', ' ', branch_lower)
-        branch_clean = re.sub(r'\s+', ' ', branch_clean).strip()
-        
-        variation_clean = re.sub(r'[&(),.-]', ' ', variation_lower)  
-        variation_clean = re.sub(r'\s+', ' ', variation_clean).strip()
-        
-        return branch_clean == variation_clean
+        # Remove common punctuation and extra spaces in one pass
+        return _CLEAN_RE.sub(' ', name_lower).strip()
     
     def get_all_branches_with_normalized(self, branches: List[str]) -> List[Tuple[str, str]]:
         """
@@ -216,21 +238,18 @@ class BranchNormalizer:
         Returns:
             List of (original_name, normalized_name) tuples
         """
-        result = []
-        seen_normalized = set()
+        # First original name seen for each normalized name
+        first_original: Dict[str, str] = {}
         
         for branch in branches:
             if not branch or not branch.strip():
                 continue
-                
-            normalized = self.normalize_branch(branch)
             
             # Avoid duplicates based on normalized name
-            if normalized not in seen_normalized:
-                result.append((branch, normalized))
-                seen_normalized.add(normalized)
+            first_original.setdefault(self.normalize_branch(branch), branch)
         
-        return sorted(result, key=lambda x: x[1])  # Sort by normalized name
+        # Sort by normalized name (unique keys, so no tie-breaking needed)
+        return [(original, normalized) for normalized, original in sorted(first_original.items())]
     
     def get_normalized_branches(self, branches: List[str]) -> List[str]:
         """
@@ -252,3 +271,8 @@ class BranchNormalizer:
             normalized_set.add(normalized)
         
         return sorted(list(normalized_set))
+
+
+# Shared instance: the mapping tables are built once per process and the
+# normalization cache is reused across requests
+NORMALIZER = BranchNormalizer()
@@ -0,0 +1,39 @@
+"""
+Small in-process caching helpers shared by the API modules.
+
+cachetools caches are not thread-safe on their own; FastAPI runs sync
+endpoints in a threadpool, so every access goes through a lock.
+"""
+
+import threading
+from typing import Any, Hashable, Optional
+
+from cachetools import TTLCache
+
+
+class LockedTTLCache:
+    """Thread-safe wrapper around ``cachetools.TTLCache``."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._cache.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
@@ -0,0 +1,70 @@
+"""
+On-disk cache of text extracted from the source PDFs.
+
+Extracting a CAP round PDF takes from seconds to minutes, and the same
+unchanged file is re-read on every run of the loader and test scripts. The
+extracted text is stored as gzipped JSON keyed by the PDF's path,
+modification time and size, so editing or replacing the PDF invalidates it.
+
+PDF_CACHE_DIR overrides the location (default ~/.cache/collegesuggester);
+set it to an empty string to disable the cache.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.expanduser(os.getenv("PDF_CACHE_DIR", "~/.cache/collegesuggester"))
+
+
+def _cache_file(pdf_path: str, kind: str) -> str:
+    stat = os.stat(pdf_path)
+    key = f"{os.path.abspath(pdf_path)}:{stat.st_mtime_ns}:{stat.st_size}:{kind}"
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json.gz")
+
+
+def load(pdf_path: str, kind: str) -> Optional[Any]:
+    """
+    Return the value stored for this version of the PDF, or None.
+
+    `kind` names the extractor, so differently extracted text of the same
+    file is cached separately.
+    """
+    if not CACHE_DIR:
+        return None
+    try:
+        with gzip.open(_cache_file(pdf_path, kind), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Missing, unreadable or half-written entries are simply re-extracted
+        return None
+
+
+def store(pdf_path: str, kind: str, value: Any) -> None:
+    """Store a JSON-serializable value for this version of the PDF."""
+    if not CACHE_DIR:
+        return
+    path = _cache_file(pdf_path, kind)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log.warning("Could not cache extracted text of %s: %s", pdf_path, e)
+
+
+def cached_extract(pdf_path: str, kind: str, extract: Callable[[], Any]) -> Any:
+    """Return `extract()` for the PDF, computing it only on a cache miss."""
+    value = load(pdf_path, kind)
+    if value is None:
+        value = extract()
+        store(pdf_path, kind, value)
+    return value
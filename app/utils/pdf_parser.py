@@ -1,28 +1,67 @@
+import csv
+import io
+import itertools
+import logging
+import os
 import re
 import pdfplumber
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import Cutoff, College
 from app.database import engine
+from app.utils import pdf_cache
 from datetime import datetime 
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 
+log = logging.getLogger(__name__)
 
-# Regular expressions
-PAIR_PATTERN = re.compile(r"(\d+)\s*\(([\d.]+)\)")
+
+# Regular expressions. The PDFs are ASCII once NFKC-normalized, so the
+# patterns use ASCII \d/\s classes instead of the slower Unicode-aware ones
+PAIR_PATTERN = re.compile(r"(\d+)\s*\(([\d.]+)\)", re.ASCII)
 # College pattern: 5 digits followed by dash and college name
-COLLEGE_LINE_PATTERN = re.compile(r"^\d{5} - ")
+COLLEGE_LINE_PATTERN = re.compile(r"^\d{5} - ", re.ASCII)
 # Course pattern: 10 digits followed by dash and course name
-COURSE_LINE_PATTERN = re.compile(r"^\d{10} - ")
+COURSE_LINE_PATTERN = re.compile(r"^\d{10} - ", re.ASCII)
 # Category line pattern: starts with "Stage" followed by categories
-CATEGORY_LINE_PATTERN = re.compile(r"^Stage\s+[A-Z0-9]+(?:\s+[A-Z0-9]+)*$")
+CATEGORY_LINE_PATTERN = re.compile(r"^Stage\s+[A-Z0-9]+(?:\s+[A-Z0-9]+)*$", re.ASCII)
 # Rank line pattern: starts with "I" followed by ranks
-RANK_LINE_PATTERN = re.compile(r"^I\s+(\d+(?:\s+\d+)*)$")
+RANK_LINE_PATTERN = re.compile(r"^I\s+(\d+(?:\s+\d+)*)$", re.ASCII)
 # Percent pattern: parentheses with decimal numbers
-PERCENT_PATTERN = re.compile(r"\(([\d.]+)\)")
+PERCENT_PATTERN = re.compile(r"\(([\d.]+)\)", re.ASCII)
+# College details line in the college list: "1150 - Name"
+COLLEGE_DETAIL_PATTERN = re.compile(r"(\d+)\s*-\s*(.+)", re.ASCII)
+# Status line two lines below a college in the college list
+STATUS_PATTERN = re.compile(r"Status\s*:\s*(.+)", re.IGNORECASE | re.ASCII)
+
+# Pages handed to each text-extraction worker at a time
+PAGE_CHUNK_SIZE = 50
+# pdf_cache entry holding the pdfplumber text of every page
+PAGE_TEXT_CACHE_KIND = "pdfplumber-page-text"
+
+# Page header lines repeated at the top of every page
+HEADER_PREFIXES = ('D Government', 'i State Common', 'r Cut Off List')
+
+# Cutoff rows are written with one COPY (Postgres) or executemany INSERT per batch
+CUTOFF_BATCH_SIZE = 1000
+# Columns of the cutoff dicts built by extract_cutoffs_from_pdf, in COPY order
+CUTOFF_COPY_COLUMNS = (
+    "college_id", "college_code", "branch", "course_code", "category",
+    "rank", "percent", "gender", "level", "stage", "year",
+)
 
 # Keyword filters
 SKIP_KEYWORDS = ["Polytechnic", "Diploma", "ITI", "MSBTE"]
 VALID_KEYWORDS = ["College", "Institute", "Engineering", "Technology"]
+# Lower-cased once for is_valid_college_line
+SKIP_KEYWORDS_LOWER = tuple(w.lower() for w in SKIP_KEYWORDS)
+VALID_KEYWORDS_LOWER = tuple(w.lower() for w in VALID_KEYWORDS)
+# Lower-cased college types skipped by load_college_data
+COLLEGE_DATA_SKIP_KEYWORDS = ("polytechnic", "diploma", "iti", "msbte", "architecture")
 
 # Helper functions
 def is_college_line(line: str) -> bool:
@@ -47,29 +86,63 @@ def is_valid_college_line(line: str) -> bool:
         return False
     
     line_lower = line.lower()
-    skip_lower = [w.lower() for w in SKIP_KEYWORDS]
-    valid_lower = [w.lower() for w in VALID_KEYWORDS]
 
     return (
-        not any(word in line_lower for word in skip_lower) and
-        any(word in line_lower for word in valid_lower)
+        not any(word in line_lower for word in SKIP_KEYWORDS_LOWER) and
+        any(word in line_lower for word in VALID_KEYWORDS_LOWER)
     )
 
 
-def get_or_create_college(db: Session, college_line: str) -> College:
-    """Extract college info and get or create college record"""
+@lru_cache(maxsize=1024)
+def category_gender_level(category: str) -> Tuple[str, str]:
+    """
+    Parse (gender, level) from a category code such as GOPENS or LOBCH.
+    
+    Only a few dozen distinct codes occur in a PDF, so after warm-up every
+    cutoff row is a cache hit.
+    """
+    gender = "female" if "L" in category else "male"
+    if "S" in category:
+        level = "state"
+    elif "O" in category:
+        level = "other"
+    elif "H" in category:
+        level = "home"
+    else:
+        level = "state"  # Default
+    return gender, level
+
+
+def get_or_create_college(
+    db: Session,
+    college_line: str,
+    college_cache: Optional[Dict[Tuple[int, str], College]] = None
+) -> College:
+    """
+    Extract college info and get or create college record.
+    
+    `college_cache` maps (code, name) to College; when given it is checked
+    before the database and new colleges are added to it.
+    """
     # Parse college line: "01002 - Government College of Engineering, Amravati"
-    match = re.match(r'^(\d{5}) - (.+)$', college_line)
-    if not match:
+    # Callers have already matched COLLEGE_LINE_PATTERN, so a split on the
+    # first " - " is enough; the cheap checks only guard direct calls
+    code_str, sep, name = college_line.partition(' - ')
+    if not sep or len(code_str) != 5 or not code_str.isdigit() or not name:
         return None
         
-    code = int(match.group(1))
-    name = match.group(2).strip()
+    code = int(code_str)
+    name = name.strip()
     
-    # Try to find existing college
-    college = db.query(College).filter(College.code == code, College.name == name).first()
-    if college:
-        return college
+    if college_cache is not None:
+        college = college_cache.get((code, name))
+        if college:
+            return college
+    else:
+        # Try to find existing college
+        college = db.query(College).filter(College.code == code, College.name == name).first()
+        if college:
+            return college
     
     # Create new college if not found
     college = College(
@@ -81,12 +154,105 @@ def get_or_create_college(db: Session, college_line: str) -> College:
     )
     db.add(college)
     db.flush()  # Get the ID without committing
+    if college_cache is not None:
+        college_cache[(code, name)] = college
     return college
 
-# Main extraction logic
-def extract_cutoffs_from_pdf(file_path: str, db: Session):
+def _page_text(page) -> Optional[str]:
+    text = page.extract_text()
+    # Drop the page's parsed chars/objects; pdfplumber keeps them cached on
+    # the Page for the life of the PDF otherwise
+    page.flush_cache()
+    return text
+
+
+def _extract_page_texts(file_path: str, start: int) -> List[Optional[str]]:
+    """Text of pages [start, start + PAGE_CHUNK_SIZE); runs in a worker process."""
+    with pdfplumber.open(file_path) as pdf:
+        return [_page_text(page) for page in pdf.pages[start:start + PAGE_CHUNK_SIZE]]
+
+
+@contextmanager
+def open_page_texts(file_path: str, workers: Optional[int] = None) -> Iterator[Iterator[Optional[str]]]:
+    """
+    Yield an iterator over the text of every page of the PDF, in page order.
+    
+    Text extraction is CPU-bound and independent per page, so chunks of
+    pages are extracted by `workers` processes (PDF_PARSE_WORKERS, default
+    one per CPU) while the caller consumes earlier pages. With one worker,
+    or a PDF of a single chunk, pages are extracted in this process.
+    
+    The texts of a fully read PDF are kept in the on-disk pdf_cache, so
+    later runs over the same file skip extraction.
+    """
+    cached = pdf_cache.load(file_path, PAGE_TEXT_CACHE_KIND)
+    if cached is not None:
+        yield iter(cached)
+        return
+    
+    texts: List[Optional[str]] = []
+    
+    def recorded(pages: Iterator[Optional[str]]) -> Iterator[Optional[str]]:
+        for text in pages:
+            texts.append(text)
+            yield text
+        # Only reached once every page has been read
+        pdf_cache.store(file_path, PAGE_TEXT_CACHE_KIND, texts)
+    
+    with _extract_all_page_texts(file_path, workers) as pages:
+        yield recorded(pages)
+
+
+@contextmanager
+def _extract_all_page_texts(file_path: str, workers: Optional[int]) -> Iterator[Iterator[Optional[str]]]:
+    if workers is None:
+        workers = int(os.getenv("PDF_PARSE_WORKERS", os.cpu_count() or 1))
+    
     with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count <= PAGE_CHUNK_SIZE:
+            yield (_page_text(page) for page in pdf.pages)
+            return
+    
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunks = pool.map(
+            _extract_page_texts,
+            itertools.repeat(file_path),
+            range(0, page_count, PAGE_CHUNK_SIZE),
+        )
+        yield itertools.chain.from_iterable(chunks)
+    finally:
+        # Don't keep extracting pages nobody will read if parsing failed
+        pool.shutdown(cancel_futures=True)
+
+
+def copy_cutoffs(db: Session, rows: List[Dict]) -> None:
+    """
+    Write cutoff dicts with Postgres COPY FROM STDIN inside the session's transaction.
+
+    COPY skips per-statement parsing and planning, which is what dominates
+    even a batched INSERT of this many small rows. None becomes an unquoted
+    empty CSV field, which COPY reads as NULL.
+    """
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows([row[col] for col in CUTOFF_COPY_COLUMNS] for row in rows)
+    buf.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Cutoff.__tablename__} ({', '.join(CUTOFF_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+    finally:
+        cursor.close()
+
+
+# Main extraction logic
+def extract_cutoffs_from_pdf(file_path: str, db: Session, workers: Optional[int] = None):
+    with open_page_texts(file_path, workers) as page_texts:
         college_obj = branch = None
+        course_code = 0
         college_line = ""
         current_category_line = ""
         rank_line = None
@@ -94,62 +260,91 @@ def extract_cutoffs_from_pdf(file_path: str, db: Session):
         
         processed_count = 0
         skipped_count = 0
+        
+        # Every existing college in one SELECT; colleges recur on many pages
+        college_cache = {(c.code, c.name): c for c in db.query(College)}
+        
+        # Plain dicts instead of Cutoff objects: no identity map or attribute
+        # instrumentation for rows that are only ever inserted
+        cutoff_batch = []
+        
+        use_copy = db.get_bind().dialect.name == "postgresql"
+        
+        def flush_cutoffs():
+            if cutoff_batch:
+                if use_copy:
+                    copy_cutoffs(db, cutoff_batch)
+                else:
+                    db.execute(insert(Cutoff), cutoff_batch)
+                cutoff_batch.clear()
 
-        for page_num, page in enumerate(pdf.pages, start=1):
+        for page_num, text in enumerate(page_texts, start=1):
             if page_num % 100 == 0:  # Progress indicator
-                print(f"📄 Processing page {page_num}...")
+                log.info("📄 Processing page %d...", page_num)
                 
-            text = page.extract_text()
             if not text:
                 continue
 
             lines = text.split("\n")
             for line_num, line in enumerate(lines):
-                line = unicodedata.normalize("NFKC", line.strip())
+                # NFKC only changes non-ASCII text; isascii() is a cheap C check
+                line = line.strip()
+                if not line.isascii():
+                    line = unicodedata.normalize("NFKC", line)
                 
                 # Skip empty lines and header lines
-                if not line or line.startswith('D Government') or line.startswith('i State Common') or line.startswith('r Cut Off List'):
+                if not line or line.startswith(HEADER_PREFIXES):
                     continue
 
+                # Each pattern below is anchored on a known first character
+                # (or needs a "("), so most lines fail a cheap check instead
+                # of running every regex
+                first_char = line[0]
+                starts_with_digit = first_char.isdigit()
+
                 # Detect college line
-                if is_valid_college_line(line):
+                if starts_with_digit and is_valid_college_line(line):
                     college_line = line
-                    college_obj = get_or_create_college(db, college_line)
+                    college_obj = get_or_create_college(db, college_line, college_cache)
                     if college_obj:
-                        print(f"\n🏫 Page {page_num}: Detected College: {college_line}")
+                        log.debug("🏫 Page %d: Detected College: %s", page_num, college_line)
                     continue
 
                 # Detect course/branch line
-                if is_course_line(line):
-                    branch = line.split(" - ", 1)[1].strip()
-                    print(f"📘 Page {page_num}: Detected Branch: {branch}")
+                if starts_with_digit and is_course_line(line):
+                    # "0100219110 - Civil Engineering": the 10-digit prefix is
+                    # the course code, parsed once for every cutoff below it
+                    course_code_str, _, branch = line.partition(" - ")
+                    course_code = int(course_code_str)
+                    branch = branch.strip()
+                    log.debug("📘 Page %d: Detected Branch: %s", page_num, branch)
                     continue
                 
                 # Detect stage markers (Stage-I, Stage-II in status or other indicators)
                 if "Stage-I" in line or "Stage-II" in line:
                     stage_marker = "Stage-I" if "Stage-I" in line else "Stage-II"
-                    print(f"🧭 Page {page_num}: Stage Marker: {stage_marker}")
+                    log.debug("🧭 Page %d: Stage Marker: %s", page_num, stage_marker)
                     continue
 
                 # Detect category line (Stage GOPENS GSCS GSTS...)
-                if is_category_line(line):
+                if first_char == "S" and is_category_line(line):
                     current_category_line = line
                     # Remove "Stage" from the beginning and get categories
                     categories = line.split()[1:]  # Skip "Stage" word
                     current_category_line = " ".join(categories)  # Store just categories
-                    print(f"📋 Page {page_num}: Category Line: {current_category_line}")
+                    log.debug("📋 Page %d: Category Line: %s", page_num, current_category_line)
                     continue
 
                 # Detect rank line (I 34240 62739 91124...)
-                if is_rank_line(line):
+                if first_char == "I" and is_rank_line(line):
                     # Extract ranks after "I "
                     rank_numbers = line.split()[1:]  # Skip "I"
-                    rank_line = [int(x) for x in rank_numbers]
-                    print(f"📈 Page {page_num}: Rank Line: {rank_line}")
+                    rank_line = list(map(int, rank_numbers))
+                    log.debug("📈 Page %d: Rank Line: %s", page_num, rank_line)
                     continue
 
                 # Detect percentile line and process cutoffs
-                percent_matches = PERCENT_PATTERN.findall(line)
+                percent_matches = PERCENT_PATTERN.findall(line) if "(" in line else None
                 if percent_matches and rank_line and current_category_line:
                     
                     # Skip Stage-II processing if desired (uncomment next lines)
@@ -158,77 +353,65 @@ def extract_cutoffs_from_pdf(file_path: str, db: Session):
                     #     rank_line = None
                     #     continue
 
-                    percents = [float(x) for x in percent_matches]
+                    percents = list(map(float, percent_matches))
                     categories = current_category_line.split()
 
-                    print(f"\n🔍 Page {page_num}: Processing cutoff data")
-                    print(f"📊 Categories ({len(categories)}): {categories}")
-                    print(f"📈 Ranks ({len(rank_line)}): {rank_line[:5]}..." if len(rank_line) > 5 else f"📈 Ranks ({len(rank_line)}): {rank_line}")
-                    print(f"📊 Percents ({len(percents)}): {percents[:5]}..." if len(percents) > 5 else f"📊 Percents ({len(percents)}): {percents}")
+                    # Per-block detail is formatted only when debug logging is on
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("🔍 Page %d: Processing cutoff data", page_num)
+                        log.debug("📊 Categories (%d): %s", len(categories), categories)
+                        log.debug("📈 Ranks (%d): %s%s", len(rank_line), rank_line[:5], "..." if len(rank_line) > 5 else "")
+                        log.debug("📊 Percents (%d): %s%s", len(percents), percents[:5], "..." if len(percents) > 5 else "")
 
                     # Match categories with ranks and percents
                     for i, cat in enumerate(categories):
                         rank = rank_line[i] if i < len(rank_line) else None
                         percent = percents[i] if i < len(percents) else None
 
-                        # Parse gender and level from category
-                        gender = "female" if "L" in cat else "male"
-                        if "S" in cat:
-                            level = "state"
-                        elif "O" in cat:
-                            level = "other"
-                        elif "H" in cat:
-                            level = "home"
-                        else:
-                            level = "state"  # Default
+                        gender, level = category_gender_level(cat)
 
                         if college_obj and branch and rank:
-                            # Extract course code from the branch line if available
-                            course_code = 0  # Default value
-                            if hasattr(branch, 'split') and len(branch.split()) > 0:
-                                # Try to extract course code from earlier processing
-                                # For now, use a default value
-                                course_code = 0
-                            
-                            cutoff = Cutoff(
-                                college_id=college_obj.id,
-                                college_code=college_obj.code,
-                                branch=branch,
-                                course_code=course_code,
-                                category=cat,
-                                rank=rank,
-                                percent=percent,
-                                gender=gender,
-                                level=level,
-                                stage=stage_marker,
-                                year=2024  # Fixed year for MH-CET 2024-25
-                            )
-                            db.add(cutoff)
+                            cutoff_batch.append({
+                                "college_id": college_obj.id,
+                                "college_code": college_obj.code,
+                                "branch": branch,
+                                "course_code": course_code,
+                                "category": cat,
+                                "rank": rank,
+                                "percent": percent,
+                                "gender": gender,
+                                "level": level,
+                                "stage": stage_marker,
+                                "year": 2024  # Fixed year for MH-CET 2024-25
+                            })
+                            if len(cutoff_batch) >= CUTOFF_BATCH_SIZE:
+                                flush_cutoffs()
                             processed_count += 1
                             if processed_count % 100 == 0:
-                                print(f"✅ Processed {processed_count} cutoffs so far...")
+                                log.debug("✅ Processed %d cutoffs so far...", processed_count)
                         else:
                             skipped_count += 1
                             if college_obj is None:
-                                print(f"⚠️ Page {page_num}: Skipped {cat} - missing college")
+                                log.debug("⚠️ Page %d: Skipped %s - missing college", page_num, cat)
                             elif branch is None:
-                                print(f"⚠️ Page {page_num}: Skipped {cat} - missing branch")
+                                log.debug("⚠️ Page %d: Skipped %s - missing branch", page_num, cat)
                             elif rank is None:
-                                print(f"⚠️ Page {page_num}: Skipped {cat} - missing rank")
+                                log.debug("⚠️ Page %d: Skipped %s - missing rank", page_num, cat)
 
                     # Reset for next set
                     rank_line = None
                     
             # Commit periodically to avoid memory issues
             if page_num % 200 == 0:
-                print(f"💾 Intermediate commit at page {page_num}...")
+                log.info("💾 Intermediate commit at page %d...", page_num)
+                flush_cutoffs()
                 db.commit()
 
         print(f"\n📊 Processing Summary:")
         print(f"✅ Successfully processed: {processed_count} cutoffs")
         print(f"⚠️ Skipped: {skipped_count} entries")
-        print(f"🔍 Final Record Count Before Final Commit: {len(db.new)}")
         
+        flush_cutoffs()
         db.commit()
         print(f"📦 Final commit completed to DB: {engine.url}")
         print("✅ All cutoffs have been processed and saved.")
@@ -236,7 +419,7 @@ def extract_cutoffs_from_pdf(file_path: str, db: Session):
 def extract_college_details(line):
     # Extract only code and name (without status)
     # Example: "1150 - Swavalambi Shikshan Sanstha's Sushganga Polytechnic, Wani"
-    match = re.match(r"(\d+)\s*-\s*(.+)", line)
+    match = COLLEGE_DETAIL_PATTERN.match(line)
     if match:
         code = match.group(1).strip()
         name = match.group(2).strip()
@@ -246,20 +429,20 @@ def extract_college_details(line):
 def load_college_data(pdf_lines, db: Session):
     colleges_to_add = []
     seen_colleges = set()
-    SKIP_KEYWORDS = ["Polytechnic", "Diploma", "ITI", "MSBTE", "architecture", "POLYTECHNIC"]
 
     i = 0
     while i < len(pdf_lines) - 2:
         code, name = extract_college_details(pdf_lines[i].strip())
         if code and name:
             # Skip college names with undesired keywords
-            if any(keyword.lower() in name.lower() for keyword in SKIP_KEYWORDS):
+            name_lower = name.lower()
+            if any(keyword in name_lower for keyword in COLLEGE_DATA_SKIP_KEYWORDS):
                 print(f"⛔ Skipped (Invalid Type): [{code}] {name}")
                 i += 1
                 continue
 
             status_line = pdf_lines[i + 2].strip()
-            status_match = re.match(r"Status\s*:\s*(.+)", status_line, re.IGNORECASE)
+            status_match = STATUS_PATTERN.match(status_line)
             if status_match:
                 status = status_match.group(1).strip()
                 college_key = (code, name, status)
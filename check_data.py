@@ -1,8 +1,10 @@
+from sqlalchemy import func, select
 from app.database import SessionLocal
 from app.models import Cutoff
 from app.database import engine
 
 with SessionLocal() as db:
-    count = db.query(Cutoff).count()
+    # Core COUNT(*) on the table: no ORM subquery wrapping
+    count = db.execute(select(func.count()).select_from(Cutoff.__table__)).scalar_one()
     print("📦 DB Path:", engine.url)
     print(f"✅ Total records in database: {count}")
@@ -3,83 +3,85 @@
 Script to check the user database for registered users
 """
 
+import io
 import sys
-import os
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-# Add the app directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
-
 from app.database import SessionLocal
 from app.auth_crud import UserCRUD
 from app.models import User, Role
 
 
-def check_users():
+def check_users(db: Session, summary_only: bool = False):
     """Check the user database for registered users"""
-    db = SessionLocal()
+    # One write at the end instead of a locked stdout write per printed line
+    out = io.StringIO()
     
     try:
-        print("🔍 Checking user database for registered users...")
-        print("=" * 60)
+        print("🔍 Checking user database for registered users...", file=out)
+        print("=" * 60, file=out)
         
-        # Get all users (including inactive ones)
-        all_users = UserCRUD.get_users(db, skip=0, limit=1000, active_only=False)
+        # Summary statistics are aggregated in one query, without loading users
+        total_users, active_users, verified_users, users_with_logins, total_logins = db.query(
+            func.count(User.id),
+            func.count(User.id).filter(User.is_active == True),
+            func.count(User.id).filter(User.is_verified == True),
+            func.count(User.id).filter(User.login_count > 0),
+            func.coalesce(func.sum(User.login_count), 0),
+        ).one()
         
-        if not all_users:
-            print("❌ No users found in the database.")
+        if not total_users:
+            print("❌ No users found in the database.", file=out)
             return
         
-        print(f"✅ Found {len(all_users)} user(s) in the database:")
-        print()
+        print(f"✅ Found {total_users} user(s) in the database:", file=out)
+        print(file=out)
+        
+        # Get all users (including inactive ones) only when listing them
+        all_users = [] if summary_only else UserCRUD.get_users(db, skip=0, limit=1000, active_only=False)
         
         # Display user information
         for i, user in enumerate(all_users, 1):
-            print(f"👤 User #{i}:")
-            print(f"   ID: {user.id}")
-            print(f"   Full Name: {user.full_name}")
-            print(f"   Email: {user.email}")
-            print(f"   Phone: {user.phone or 'Not provided'}")
-            print(f"   Status: {'🟢 Active' if user.is_active else '🔴 Inactive'}")
-            print(f"   Verified: {'✅ Yes' if user.is_verified else '❌ No'}")
-            print(f"   Login Count: {user.login_count}")
-            print(f"   Created: {user.created_at}")
-            print(f"   Last Updated: {user.updated_at or 'Never'}")
-            print(f"   Last Login: {user.last_login or 'Never'}")
+            print(f"👤 User #{i}:", file=out)
+            print(f"   ID: {user.id}", file=out)
+            print(f"   Full Name: {user.full_name}", file=out)
+            print(f"   Email: {user.email}", file=out)
+            print(f"   Phone: {user.phone or 'Not provided'}", file=out)
+            print(f"   Status: {'🟢 Active' if user.is_active else '🔴 Inactive'}", file=out)
+            print(f"   Verified: {'✅ Yes' if user.is_verified else '❌ No'}", file=out)
+            print(f"   Login Count: {user.login_count}", file=out)
+            print(f"   Created: {user.created_at}", file=out)
+            print(f"   Last Updated: {user.updated_at or 'Never'}", file=out)
+            print(f"   Last Login: {user.last_login or 'Never'}", file=out)
             
             # Get user roles
-            roles = [role.name for role in user.roles]
-            print(f"   Roles: {', '.join(roles) if roles else 'No roles assigned'}")
-            print("-" * 40)
+            roles = ", ".join(role.name for role in user.roles)
+            print(f"   Roles: {roles or 'No roles assigned'}", file=out)
+            print("-" * 40, file=out)
         
         # Summary statistics
-        active_users = [u for u in all_users if u.is_active]
-        verified_users = [u for u in all_users if u.is_verified]
-        
-        print("\n📊 Summary Statistics:")
-        print(f"   Total Users: {len(all_users)}")
-        print(f"   Active Users: {len(active_users)}")
-        print(f"   Inactive Users: {len(all_users) - len(active_users)}")
-        print(f"   Verified Users: {len(verified_users)}")
-        print(f"   Unverified Users: {len(all_users) - len(verified_users)}")
+        print("\n📊 Summary Statistics:", file=out)
+        print(f"   Total Users: {total_users}", file=out)
+        print(f"   Active Users: {active_users}", file=out)
+        print(f"   Inactive Users: {total_users - active_users}", file=out)
+        print(f"   Verified Users: {verified_users}", file=out)
+        print(f"   Unverified Users: {total_users - verified_users}", file=out)
         
         # Check for users with login activity
-        users_with_logins = [u for u in all_users if u.login_count > 0]
-        print(f"   Users with Login Activity: {len(users_with_logins)}")
+        print(f"   Users with Login Activity: {users_with_logins}", file=out)
         
         if users_with_logins:
-            print(f"   Total Login Attempts: {sum(u.login_count for u in all_users)}")
+            print(f"   Total Login Attempts: {total_logins}", file=out)
         
     except Exception as e:
-        print(f"❌ Error checking users: {e}")
+        print(f"❌ Error checking users: {e}", file=out)
     finally:
-        db.close()
+        sys.stdout.write(out.getvalue())
 
 
-def check_roles():
+def check_roles(db: Session):
     """Check available roles in the database"""
-    db = SessionLocal()
-    
     try:
         print("\n🔍 Checking available roles...")
         print("=" * 40)
@@ -96,15 +98,20 @@ def check_roles():
             
     except Exception as e:
         print(f"❌ Error checking roles: {e}")
-    finally:
-        db.close()
 
 
-if __name__ == "__main__":
+def main():
     print("🏫 College Connect - User Database Checker")
     print("=" * 60)
     
-    check_users()
-    check_roles()
+    # Both checks share one session, one transaction and so one pooled connection
+    with SessionLocal() as db, db.begin():
+        # --summary prints only the aggregate statistics, without loading users
+        check_users(db, summary_only="--summary" in sys.argv[1:])
+        check_roles(db)
     
     print("\n✅ Database check completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 from app.database import engine, Base
 from app.models import Cutoff, College  # Make sure Cutoff is imported here
 
-# Create all tables defined in Base's subclasses
+# Create all tables defined in Base's subclasses. Existing tables are skipped;
+# on Postgres the metadata's after_create DDL also creates the
+# cutoff_suggestions materialized view if it is missing, populated from the
+# cutoffs already loaded, so this is safe to re-run on a deployed database
 Base.metadata.create_all(bind=engine)
 
 print("✅ Tables created successfully.")
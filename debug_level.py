@@ -1,22 +1,20 @@
-import sys
-sys.path.append('.')
 from app.database import SessionLocal
 from app.models import Cutoff
-from sqlalchemy import distinct
+from sqlalchemy import distinct, select
 
 db = SessionLocal()
 
 # Check what level values exist for GOPENH category
-levels = db.query(distinct(Cutoff.level)).filter(
-    Cutoff.category == 'GOPENH'
+levels = db.scalars(
+    select(distinct(Cutoff.level)).where(Cutoff.category == 'GOPENH')
 ).all()
 
 print('Levels for GOPENH category:')
 for level in levels:
-    print(f'  "{level[0]}"')
+    print(f'  "{level}"')
 
 # Check a sample record
-sample = db.query(Cutoff).filter(Cutoff.category == 'GOPENH').first()
+sample = db.scalars(select(Cutoff).where(Cutoff.category == 'GOPENH').limit(1)).first()
 if sample:
     print(f'Sample GOPENH record:')
     print(f'  Category: {sample.category}')
@@ -26,16 +24,15 @@ if sample:
 # Check what happens if we remove level filter completely
 print('\nTesting without level filter:')
 from app.models import College
-from sqlalchemy import or_
-
-no_level_results = db.query(Cutoff).join(College).filter(
-    Cutoff.rank >= 10000,
-    Cutoff.rank.isnot(None),
-    or_(
-        Cutoff.category.like('%GOPENH%'),
-        Cutoff.category.like('%GOPEN%')
-    )
-).limit(3).all()
+
+# GOPEN only ever starts a category name (GOPENS/GOPENH/GOPENO), so a prefix
+# LIKE matches the same rows and can use ix_cutoff_category_pattern
+no_level_results = db.scalars(
+    select(Cutoff).join(College).where(
+        Cutoff.rank >= 10000,
+        Cutoff.category.like('GOPEN%'),
+    ).limit(3)
+).all()
 
 print(f'Results without level filter: {len(no_level_results)}')
 for result in no_level_results:
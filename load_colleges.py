@@ -1,19 +1,61 @@
 from app.database import SessionLocal
+from app.utils import pdf_cache
 from app.utils.pdf_parser import load_college_data
-import pdfplumber
-import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
+import pypdfium2 as pdfium
 
-def extract_lines(pdf_path):
+def _extract_range(pdf_path, start, stop):
+    # Each worker opens its own document: PDFium handles can't be shared
+    # across processes
+    print(f"Extracting text from pages {start + 1}-{stop}...")
     lines = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, start=1):
-            print(f"Extracting text from page {page_num}...")
-            text = page.extract_text()
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded()
+            textpage.close()
+            page.close()
             if text:
                 lines.extend(text.splitlines())
+    finally:
+        pdf.close()
     return lines
 
 
+def extract_lines(pdf_path, workers=None):
+    # Re-runs over an unchanged PDF read the lines back from pdf_cache
+    return pdf_cache.cached_extract(
+        pdf_path, "pdfium-lines", lambda: _extract_lines(pdf_path, workers)
+    )
+
+
+def _extract_lines(pdf_path, workers):
+    # PDFium's text extraction runs in C with no layout analysis. The college
+    # list only needs the "code - name" and "Status:" lines in reading order,
+    # which it keeps, so it is used here instead of pdfplumber.
+    if workers is None:
+        workers = int(os.getenv("PDF_PARSE_WORKERS", os.cpu_count() or 1))
+    
+    pdf = pdfium.PdfDocument(pdf_path)
+    page_count = len(pdf)
+    pdf.close()
+    
+    if workers <= 1:
+        return _extract_range(pdf_path, 0, page_count)
+    
+    # One contiguous page range per worker, concatenated back in page order
+    step = -(-page_count // workers)
+    starts = range(0, page_count, step)
+    stops = [min(start + step, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_extract_range, repeat(pdf_path), starts, stops)
+        return [line for part in parts for line in part]
+
+
 def main():
     db = SessionLocal()
     try:
@@ -1,15 +1,60 @@
 # load_pdf_data.py
+import logging
+import sys
+from contextlib import contextmanager
+
 from app.database import SessionLocal, engine
+from app.models import Cutoff
 from app.utils.pdf_parser import extract_cutoffs_from_pdf
+from app.apis.college_suggestion import refresh_cutoff_suggestions
+from app.crud import refresh_ranked_colleges
 
 # Path to your stored PDF file
 pdf_path = "app/data/mh-cet-cap-1.pdf"
 
+# Page progress at INFO; set DEBUG to trace every detected line
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+
+@contextmanager
+def cutoff_indexes_dropped(db):
+    """
+    Drop the cutoffs secondary indexes for the duration of a bulk load.
+
+    Building each index once over the loaded table is much cheaper than
+    updating all of them on every inserted row. Postgres only; the indexes
+    are recreated even if the load fails.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    indexes = list(Cutoff.__table__.indexes)
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    try:
+        yield
+    finally:
+        # A failed load leaves its transaction open on cutoffs, which would
+        # block CREATE INDEX; after the parser's final commit this is a no-op
+        db.rollback()
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 # Create a DB session
 db = SessionLocal()
 
 # Extract and insert cutoffs
-extract_cutoffs_from_pdf(pdf_path, db)
+with cutoff_indexes_dropped(db):
+    extract_cutoffs_from_pdf(pdf_path, db)
+
+# Rebuild the denormalized view the suggestion endpoints read from
+refresh_cutoff_suggestions(db)
+
+# Opt-in: the rebuild replaces every ranked_colleges row, including any
+# written by other means (e.g. curated branch names)
+if "--rebuild-ranked-colleges" in sys.argv[1:]:
+    refresh_ranked_colleges(db)
 
 # Close session
 db.close()
@@ -1,19 +1,43 @@
 # app/scripts/load_regions.py
 
+from sqlalchemy import case, func, select, update
 from app.database import SessionLocal
 from app.models import College
 
+# Every character str.strip() removes; SQL trim() alone strips only spaces
+_WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
 def extract_region(name: str) -> str:
-    parts = name.split(",")
-    return parts[-1].strip() if len(parts) > 1 else ""
+    _, sep, tail = name.rpartition(",")
+    return tail.strip() if sep else ""
 
 def update_regions():
     db = SessionLocal()
     try:
-        colleges = db.query(College).all()
-        for college in colleges:
-            region = extract_region(college.name)
-            college.region = region
+        if db.get_bind().dialect.name == "postgresql":
+            # One UPDATE computing extract_region in SQL: the text after the
+            # last comma, or "" when the name has none
+            db.execute(update(College).values(region=case(
+                (func.strpos(College.name, ",") > 0,
+                 func.btrim(
+                     func.reverse(func.split_part(func.reverse(College.name), ",", 1)),
+                     _WHITESPACE,
+                 )),
+                else_="",
+            )))
+        else:
+            # Elsewhere read only (id, name) and send one executemany UPDATE
+            # by primary key instead of flushing each loaded College
+            mappings = [
+                {"id": college_id, "region": extract_region(name)}
+                for college_id, name in db.execute(select(College.id, College.name))
+            ]
+            if mappings:
+                db.execute(update(College), mappings)
         db.commit()
         print("✅ Region field updated for all colleges.")
     except Exception as e:
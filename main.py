@@ -2,20 +2,41 @@
 Main FastAPI application with authentication and college suggestion features
 """
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import json
+import logging
+import os
+import anyio.to_thread
 
-from app.routes import router as college_router
+from app.routes import router as college_router, warm_catalog_cache
 from app.auth_routes import auth_router, user_router, admin_router
-from app.database import engine, Base
+from app.database import engine, Base, DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+# Sync routes and DB calls run in anyio's worker threads (default 40); match
+# the connection pool's capacity (pool_size + max_overflow) so requests queue
+# for a connection rather than for a thread
+THREADPOOL_SIZE = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# Explicit origins (a JSON list, as in the README) instead of "*": with
+# credentials allowed a wildcard makes the middleware echo back any origin
+ALLOWED_ORIGINS = json.loads(os.getenv("ALLOWED_ORIGINS", '["http://localhost:4200"]'))
+
+log = logging.getLogger(__name__)
 
 # Create database tables on startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # create_all probes the catalog for every table on each worker boot;
+    # deployed schemas are managed out of band
+    if os.getenv("AUTO_CREATE_TABLES") == "1":
+        print("Creating database tables...")
+        Base.metadata.create_all(bind=engine)
+    await anyio.to_thread.run_sync(warm_catalog_cache)
     yield
     # Shutdown
     print("Application shutting down...")
@@ -36,16 +57,30 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Anything a route doesn't turn into an HTTPException ends up here once, instead
+# of every route wrapping its body in try/except; details go to the log, not
+# to the client. A middleware registered before CORSMiddleware runs inside it,
+# so these 500s still carry CORS headers (an Exception handler would run in
+# ServerErrorMiddleware, outside CORS, and re-raise into a second log entry)
+@app.middleware("http")
+async def catch_unhandled_errors(request: Request, call_next):
+    try:
+        return await call_next(request)
+    except Exception:
+        log.exception("Unhandled error on %s %s", request.method, request.url.path)
+        return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # Include routers
@@ -81,9 +116,19 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    # Public and unauthenticated: pool internals are served by /admin/db-pool
     return {"status": "healthy", "version": "2.0.0"}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Auto-reload only when DEBUG is set; otherwise run WORKERS processes.
+    # uvicorn already picks uvloop and httptools (both in requirements.txt)
+    # when they are importable, and falls back to asyncio/h11 where they aren't
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        reload=os.getenv("DEBUG", "").lower() in ("1", "true"),
+        workers=int(os.getenv("WORKERS", "1")),
+    )
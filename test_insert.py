@@ -13,6 +13,9 @@ cutoff = Cutoff(
     level="home"
 )
 
+# A single row is fine through the ORM. For many rows, skip the unit of work
+# and send one executemany INSERT per batch of dicts, as the PDF loader does:
+#     db.execute(insert(Cutoff), [{"college_id": ..., "branch": ..., ...}, ...])
 db.add(cutoff)
 db.commit()
 print("✅ Inserted test record.")
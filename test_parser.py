@@ -3,12 +3,6 @@
 Test script for the updated PDF parser
 """
 
-import sys
-import os
-
-# Add the app directory to Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from app.database import SessionLocal
 from app.utils.pdf_parser import extract_cutoffs_from_pdf
 from app.models import Cutoff, College
@@ -1,5 +1,3 @@
-import sys
-sys.path.append('.')
 from app.database import SessionLocal
 from app.apis.college_suggestion import get_suggested_colleges
 
@@ -21,7 +19,7 @@ try:
     
     if colleges:
         for i, college in enumerate(colleges[:5]):
-            print(f'{i+1}. {college.college.name}')
+            print(f'{i+1}. {college.college_name}')
             print(f'   Branch: {college.branch}')
             print(f'   Category: {college.category}')
             print(f'   Rank: {college.rank}')